@@ -0,0 +1,44 @@
+import dimension_codes
+
+# Precomputed aggregation cube over the four filter dimensions. It is built
+# with a single groupby per loaded file; every summary, chart and metric is
+# then answered by slicing and rolling up the (much smaller) cube instead of
+# rescanning the holdings rows.
+
+CUBE_DIMENSIONS = ['Portfolio', 'Member', 'Broker', 'Sector']
+CUBE_MEASURES = ['Value At Cost', 'Value At Market Price', 'Qty']
+
+
+def build_cube(df):
+    """Aggregate measures and row counts at every Portfolio × Member × Broker × Sector cell"""
+    # Rows with a blank dimension keep their own cells so totals still include them
+    grouped = df.groupby(CUBE_DIMENSIONS, sort=False, observed=True, dropna=False)
+    cube = grouped[CUBE_MEASURES].sum()
+    cube['Count'] = grouped.size()
+    return cube.reset_index()
+
+
+def slice_cube(cube, filters):
+    """Keep only the cube cells matching filters, a {dimension: value} dict where 'All' or None means no filter"""
+    mask = None
+    for dim, value in filters.items():
+        if value is None or value == 'All':
+            continue
+        dim_mask = dimension_codes.equals_mask(cube[dim], value)
+        mask = dim_mask if mask is None else mask & dim_mask
+    if mask is None:
+        return cube
+    return cube[mask]
+
+
+def rollup(cube, dims):
+    """Roll the cube up to the given dimensions"""
+    measures = CUBE_MEASURES + ['Count']
+    if not dims:
+        return cube[measures].sum()
+    return cube.groupby(dims, observed=True)[measures].sum().reset_index()
+
+
+def totals(cube):
+    """Grand totals of every measure as a Series"""
+    return rollup(cube, [])
@@ -0,0 +1,135 @@
+"""Headless per-Portfolio and per-Member reports built on the dashboard tables.
+
+Usage:
+    python batch_report.py portfolio-inputs.csv --output-dir reports --format csv json html --workers 8
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import aggregation_cube
+import dimension_codes
+from portfolio_core import (
+    REQUIRED_COLUMNS, load_translations, load_portfolio_file,
+    create_summary_table, create_detail_table
+)
+
+# Summary grouping used inside each report
+REPORT_SUMMARY_BY = {
+    'Portfolio': 'Member',
+    'Member': 'Sector'
+}
+
+# Per-worker state, loaded once by the pool initializer
+_worker = {}
+
+
+def slugify(value):
+    """File-name friendly and unique version of a group value
+
+    Letters, combining marks (Tamil vowel signs) and digits of any script are
+    kept; a short hash of the exact value keeps names that slug alike ("A.B",
+    "A B") from overwriting each other.
+    """
+    text = str(value)
+    kept = ''.join(ch if unicodedata.category(ch)[0] in 'LMN' else '-' for ch in text)
+    slug = re.sub(r'-+', '-', kept).strip('-').lower() or 'blank'
+    return f"{slug}-{hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _init_worker(path, output_dir, formats, lang):
+    df, _ = load_portfolio_file(path)
+    _worker.update({
+        'df': df,
+        'cube': aggregation_cube.build_cube(df),
+        'output_dir': output_dir,
+        'formats': formats,
+        'lang': lang,
+        'translations': load_translations()
+    })
+
+
+def render_group(task):
+    """Write the report files for one (group column, value) pair and return their paths"""
+    group_col, value = task
+    df = _worker['df']
+    translations = _worker['translations']
+    lang = _worker['lang']
+
+    rows = df[dimension_codes.equals_mask(df[group_col], value)]
+    rows = rows.sort_values([REPORT_SUMMARY_BY[group_col], 'Company Name'])
+    cube = aggregation_cube.slice_cube(_worker['cube'], {group_col: value})
+    _, summary_display = create_summary_table(cube, translations, lang, REPORT_SUMMARY_BY[group_col])
+    _, detail_display = create_detail_table(rows, translations, lang)
+
+    out_dir = os.path.join(_worker['output_dir'], group_col.lower())
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, slugify(value))
+    written = []
+
+    if 'csv' in _worker['formats']:
+        summary_display.to_csv(base + '-summary.csv', index=False)
+        detail_display.to_csv(base + '-detail.csv', index=False)
+        written += [base + '-summary.csv', base + '-detail.csv']
+    if 'json' in _worker['formats']:
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'group': group_col,
+                'value': str(value),
+                'summary': json.loads(summary_display.to_json(orient='records')),
+                'detail': json.loads(detail_display.to_json(orient='records'))
+            }, f, ensure_ascii=False, indent=2)
+        written.append(base + '.json')
+    if 'html' in _worker['formats']:
+        with open(base + '.html', 'w', encoding='utf-8') as f:
+            f.write(f"<html><head><meta charset='utf-8'><title>{group_col}: {value}</title></head><body>\n")
+            f.write(f"<h1>{translations[lang]['title']} - {group_col}: {value}</h1>\n")
+            f.write(f"<h2>{translations[lang]['summary_table']}</h2>\n")
+            f.write(summary_display.to_html(index=False, float_format=lambda x: f"{x:,.2f}"))
+            f.write(f"\n<h2>{translations[lang]['detail_table']}</h2>\n")
+            f.write(detail_display.to_html(index=False, float_format=lambda x: f"{x:,.2f}"))
+            f.write("\n</body></html>\n")
+        written.append(base + '.html')
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate per-Portfolio and per-Member holdings reports")
+    parser.add_argument('holdings', help="Holdings CSV with the dashboard's required columns")
+    parser.add_argument('--output-dir', default='reports')
+    parser.add_argument('--format', nargs='+', choices=['csv', 'json', 'html'], default=['csv'])
+    parser.add_argument('--by', nargs='+', choices=list(REPORT_SUMMARY_BY), default=list(REPORT_SUMMARY_BY))
+    parser.add_argument('--lang', choices=['en', 'ta'], default='en')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df, _ = load_portfolio_file(args.holdings)
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        print(f"Missing columns: {', '.join(missing_columns)}", file=sys.stderr)
+        return 1
+
+    tasks = [(col, value) for col in args.by for value in dimension_codes.options(df[col], sort=True)]
+    init_args = (args.holdings, args.output_dir, args.format, args.lang)
+
+    if args.workers and args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=init_args) as pool:
+            results = list(pool.map(render_group, tasks, chunksize=max(1, len(tasks) // (args.workers * 4))))
+    else:
+        _init_worker(*init_args)
+        results = [render_group(task) for task in tasks]
+
+    files = sum(len(written) for written in results)
+    print(f"Wrote {files} files for {len(tasks)} groups to {args.output_dir} in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Memory of the dimension columns as object strings versus categoricals on a synthetic book.
+
+Usage: python benchmarks/bench_categorical_memory.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dimension_codes
+
+DIMENSIONS = ['Portfolio', 'Broker', 'Member', 'Sector', 'Company Name']
+
+
+def make_book(rows, seed=0):
+    """Synthetic holdings with realistic dimension cardinalities, as object strings"""
+    rng = np.random.default_rng(seed)
+    cardinality = {'Portfolio': 5, 'Broker': 12, 'Member': 300, 'Sector': 40, 'Company Name': 3000}
+    data = {}
+    for col, size in cardinality.items():
+        labels = np.array([f"{col.upper()} {i:05d}" for i in range(size)], dtype=object)
+        data[col] = labels[rng.integers(0, size, rows)]
+    return pd.DataFrame(data)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    book = make_book(rows)
+
+    report = dimension_codes.memory_report(book, DIMENSIONS)
+    total_object = report['Object Bytes'].sum()
+    total_category = report['Categorical Bytes'].sum()
+    print(f"rows: {rows:,}")
+    print(report.to_string(index=False))
+    print(f"total: {total_object / 2**20:,.1f} MiB -> {total_category / 2**20:,.1f} MiB "
+          f"({(1 - total_category / total_object) * 100:.1f}% smaller)")
+
+    encoded = dimension_codes.encode_dimensions(book.copy(), DIMENSIONS)
+    member = book['Member'].iloc[0]
+    start = time.perf_counter()
+    (book['Member'] == member).to_numpy()
+    object_time = time.perf_counter() - start
+    start = time.perf_counter()
+    dimension_codes.equals_mask(encoded['Member'], member)
+    code_time = time.perf_counter() - start
+    print(f"member filter: object {object_time * 1000:.1f} ms, codes {code_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
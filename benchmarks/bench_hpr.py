@@ -0,0 +1,62 @@
+"""Compare the row-wise calculate_hpr apply path with the vectorized returns engine.
+
+Usage: python benchmarks/bench_hpr.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import returns_engine
+
+
+def calculate_hpr(current_value, cost_value):
+    """Scalar HPR, identical to stock_portfolio_dashboard.calculate_hpr"""
+    if cost_value == 0:
+        return 0
+    return ((current_value - cost_value) / cost_value) * 100
+
+
+def make_frame(rows, seed=0):
+    """Random lots with a sprinkling of zero-cost rows"""
+    rng = np.random.default_rng(seed)
+    cost = rng.uniform(100, 100000, rows).round(2)
+    cost[rng.random(rows) < 0.01] = 0
+    market = (cost * rng.uniform(0.5, 2.0, rows)).round(2)
+    return pd.DataFrame({'Value At Cost': cost, 'Value At Market Price': market})
+
+
+def timed(func, repeat=3):
+    """Best wall time of func over repeat runs"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    df = make_frame(rows)
+
+    apply_time, expected = timed(lambda: df.apply(
+        lambda row: calculate_hpr(row['Value At Market Price'], row['Value At Cost']),
+        axis=1
+    ), repeat=1)
+    vector_time, actual = timed(lambda: returns_engine.hpr(df['Value At Market Price'], df['Value At Cost']))
+
+    assert np.allclose(expected.to_numpy(dtype='float64'), actual.to_numpy())
+    print(f"rows:       {rows:,}")
+    print(f"apply:      {apply_time * 1000:10.1f} ms")
+    print(f"vectorized: {vector_time * 1000:10.1f} ms")
+    print(f"speedup:    {apply_time / vector_time:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
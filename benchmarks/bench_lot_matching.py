@@ -0,0 +1,30 @@
+"""Time FIFO lot matching over generated transactions with sales.
+
+Usage: python benchmarks/bench_lot_matching.py [rows ...]
+"""
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import columnar_store
+import lot_matching
+from generate_portfolio import generate_transactions, add_sales
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for rows in sizes:
+        df = columnar_store.apply_schema(add_sales(generate_transactions(rows), fraction=0.3))
+        start = time.perf_counter()
+        matches, open_lots = lot_matching.match_lots(df)
+        seconds = time.perf_counter() - start
+        print(f"{len(df):>10,} transactions: {seconds * 1000:9.1f} ms "
+              f"({len(matches):,} matched pieces, {len(open_lots):,} open lots)")
+
+
+if __name__ == "__main__":
+    main()
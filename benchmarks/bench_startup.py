@@ -0,0 +1,63 @@
+"""Time from a cold interpreter to the first summary table, with eager versus lazy heavy imports.
+
+Each measurement runs in a fresh Python process so module caches do not carry
+over. "eager" imports plotly.express, graph_objects, make_subplots, plotly.io
+and fpdf up front, as the dashboards used to; "lazy" imports the dashboard
+module as it is now. Both then load portfolio-inputs.csv and build the
+summary table.
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SUMMARY = """
+import aggregation_cube
+from portfolio_core import load_translations, load_portfolio_file, create_summary_table
+df, _ = load_portfolio_file('portfolio-inputs.csv')
+create_summary_table(aggregation_cube.build_cube(df), load_translations(), 'en')
+print(time.perf_counter() - start)
+"""
+
+SCRIPTS = {
+    'eager': """
+import time
+start = time.perf_counter()
+import streamlit, pandas
+import plotly.express, plotly.graph_objects, plotly.io
+from plotly.subplots import make_subplots
+from fpdf import FPDF
+import stock_portfolio_dashboard
+""" + SUMMARY,
+    'lazy': """
+import time
+start = time.perf_counter()
+import stock_portfolio_dashboard
+""" + SUMMARY
+}
+
+
+def time_to_summary(script):
+    output = subprocess.run(
+        [sys.executable, '-c', script], cwd=REPO_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Warm the OS file cache and the Parquet copy so only imports differ
+    time_to_summary(SCRIPTS['eager'])
+    results = {}
+    for label, script in SCRIPTS.items():
+        results[label] = statistics.median(time_to_summary(script) for _ in range(runs))
+        print(f"{label:>6}: {results[label] * 1000:8.1f} ms to first summary (median of {runs})")
+    print(f" saved: {(results['eager'] - results['lazy']) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
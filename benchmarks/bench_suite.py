@@ -0,0 +1,259 @@
+"""Scaling benchmarks for the dashboard pipeline stages on synthetic books.
+
+Generates holdings files in both schemas, times load, clean, filter,
+summarize, format and chart-prep stages at each size, records peak traced
+memory, and compares against benchmarks/baseline.json. Exits non-zero when
+any stage regresses beyond the tolerances.
+
+Timings are medians of several runs and are compared relative to a fixed
+reference workload timed in the same run, so a baseline recorded on one
+machine still gates runs on a faster or slower one.
+
+Usage:
+    python benchmarks/bench_suite.py                      # default sizes, compare with baseline
+    python benchmarks/bench_suite.py --sizes 1000 1000000 10000000
+    python benchmarks/bench_suite.py --update-baseline
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import aggregation_cube
+import binary_store
+import columnar_store
+import dimension_codes
+import returns_engine
+import risk_metrics
+import table_rendering
+from filter_index import FilterIndex, sort_positions
+from generate_portfolio import generate_holdings, generate_transactions
+from portfolio_core import (
+    REQUIRED_COLUMNS, TRANSACTION_FILTER_COLUMNS, load_translations, clean_portfolio_data,
+    create_summary_table, create_detail_table, top_performers
+)
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# Baseline key of the reference workload's time
+REFERENCE_KEY = 'reference'
+
+
+def measure(func, repeat):
+    """Median wall time over repeat runs, and peak traced memory of one extra run"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(np.median(times)), peak
+
+
+def reference_workload():
+    """Fixed pandas/NumPy work (grouped sum and sort over 1M rows) that stands for this machine's speed"""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'key': rng.integers(0, 1000, 1_000_000), 'value': rng.random(1_000_000)})
+
+    def work():
+        frame.groupby('key')['value'].sum()
+        np.sort(frame['value'].to_numpy())
+    return work
+
+
+def _serialize(df, return_cols):
+    """What st.dataframe does with a rendered table: style computation and Arrow conversion"""
+    styled = table_rendering.style_returns(df, return_cols)
+    if styled is not df:
+        styled._compute()
+    pa.Table.from_pandas(df)
+
+
+def open_binary(path, columns=None):
+    """Map the ingested binary store and touch every mapped column, so the pages are actually read"""
+    df = binary_store.open_store(columnar_store.binary_path(path), columns)
+    for col in df.columns:
+        values = df[col].cat.codes if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col]
+        values.to_numpy().view('u1').max()
+    return df
+
+
+def holdings_stages(path):
+    """Stage callables for the portfolio-inputs.csv schema"""
+    translations = load_translations()
+    raw = pd.read_csv(path)
+    columnar_store.convert_csv(path)
+    columnar_store.ingest_binary(path)
+    df = clean_portfolio_data(raw.copy())
+    member = dimension_codes.options(df['Member'])[0]
+
+    def filter_rows():
+        index = FilterIndex(df, aggregation_cube.CUBE_DIMENSIONS)
+        df.take(sort_positions(df, index.resolve({'Member': member}), ['Sector', 'Company Name']))
+
+    def summarize():
+        cube = aggregation_cube.build_cube(df)
+        create_summary_table(cube, translations, 'en', 'Member')
+
+    def format_detail():
+        _, detail_display = create_detail_table(df, translations, 'en')
+        _serialize(detail_display, [translations['en']['hpr']])
+
+    def chart_prep():
+        cube = aggregation_cube.build_cube(df)
+        for dim in ['Sector', 'Member', 'Broker']:
+            aggregation_cube.rollup(cube, [dim])
+        top_performers(df)
+
+    return {
+        'load_csv': lambda: pd.read_csv(path),
+        'load_columnar': lambda: pd.read_parquet(columnar_store.columnar_path(path), columns=REQUIRED_COLUMNS),
+        'load_binary': lambda: open_binary(path, REQUIRED_COLUMNS),
+        'clean': lambda: clean_portfolio_data(raw.copy()),
+        'filter': filter_rows,
+        'summarize': summarize,
+        'format': format_detail,
+        'chart_prep': chart_prep
+    }
+
+
+def transactions_stages(path):
+    """Stage callables for the portfolio.csv schema"""
+    raw = pd.read_csv(path)
+    columnar_store.convert_csv(path)
+    columnar_store.ingest_binary(path)
+    df = columnar_store.apply_schema(raw.copy())
+    members = dimension_codes.options(df['family member name'])[:5]
+
+    def summarize():
+        summary = df.groupby('family member name', observed=True)[['invested amount', 'current value']].sum()
+        summary['return (%)'] = returns_engine.hpr(summary['current value'], summary['invested amount'])
+
+    def format_detail():
+        display_data = df.copy()
+        display_data['return (%)'] = returns_engine.hpr(df['current value'], df['invested amount'])
+        _serialize(display_data, ['return (%)'])
+
+    return {
+        'load_csv': lambda: pd.read_csv(path),
+        'load_columnar': lambda: pd.read_parquet(columnar_store.columnar_path(path)),
+        'load_binary': lambda: open_binary(path),
+        'clean': lambda: columnar_store.apply_schema(raw.copy()),
+        'filter': lambda: df[dimension_codes.isin_mask(df['family member name'], members)],
+        'summarize': summarize,
+        'format': format_detail,
+        'chart_prep': lambda: risk_metrics.WeightedMetrics(df, TRANSACTION_FILTER_COLUMNS).weighted('sector code')
+    }
+
+
+SCHEMAS = {
+    'holdings': (generate_holdings, holdings_stages),
+    'transactions': (generate_transactions, transactions_stages)
+}
+
+
+def run(sizes, schemas, tmp_dir):
+    reference, _ = measure(reference_workload(), 7)
+    results = {REFERENCE_KEY: {'seconds': reference, 'peak_bytes': 0}}
+    print(f"{REFERENCE_KEY:<40} {reference * 1000:12.2f} ms", flush=True)
+    for schema in schemas:
+        generate, stages_for = SCHEMAS[schema]
+        for rows in sizes:
+            path = os.path.join(tmp_dir, f"{schema}-{rows}.csv")
+            generate(rows).to_csv(path, index=False)
+            repeat = 5 if rows <= 100_000 else 1
+            for stage, func in stages_for(path).items():
+                seconds, peak = measure(func, repeat)
+                key = f"{schema}/{rows}/{stage}"
+                results[key] = {'seconds': seconds, 'peak_bytes': peak}
+                print(f"{key:<40} {seconds * 1000:12.2f} ms {peak / 2**20:12.2f} MiB", flush=True)
+    return results
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance, min_seconds, min_rows):
+    """Stages slower or hungrier than baseline beyond the tolerances
+
+    Times are compared after scaling the baseline by how much slower or faster
+    the reference workload ran here than when the baseline was recorded.
+    """
+    regressions = []
+    speed = 1.0
+    if REFERENCE_KEY in baseline:
+        speed = results[REFERENCE_KEY]['seconds'] / baseline[REFERENCE_KEY]['seconds']
+    for key, result in results.items():
+        if key not in baseline or key == REFERENCE_KEY:
+            continue
+        base = baseline[key]
+        expected = base['seconds'] * speed
+        rows = int(key.split('/')[1])
+        # Very short stages and small books are dominated by timer noise; memory is gated at every size
+        if rows >= min_rows and result['seconds'] > max(expected * time_tolerance, min_seconds):
+            regressions.append(f"{key}: {result['seconds'] * 1000:.2f} ms vs baseline {expected * 1000:.2f} ms "
+                               f"(recorded {base['seconds'] * 1000:.2f} ms, machine speed x{speed:.2f})")
+        if result['peak_bytes'] > base['peak_bytes'] * memory_tolerance and result['peak_bytes'] - base['peak_bytes'] > 1 << 20:
+            regressions.append(f"{key}: {result['peak_bytes'] / 2**20:.2f} MiB vs baseline {base['peak_bytes'] / 2**20:.2f} MiB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES)
+    parser.add_argument('--schemas', nargs='+', choices=list(SCHEMAS), default=list(SCHEMAS))
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--time-tolerance', type=float, default=1.5)
+    parser.add_argument('--memory-tolerance', type=float, default=1.25)
+    # Stages under this are within timer and scheduler noise, whatever the ratio
+    parser.add_argument('--min-seconds', type=float, default=0.02,
+                        help="Never flag a stage as slower while it runs under this many seconds")
+    parser.add_argument('--min-rows', type=int, default=100_000,
+                        help="Only gate timings for books of at least this many rows")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = run(args.sizes, args.schemas, tmp_dir)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance, args.min_seconds,
+                          args.min_rows)
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
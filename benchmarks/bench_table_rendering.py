@@ -0,0 +1,102 @@
+"""Compare the string-formatting + Styler.applymap table path with numeric rendering.
+
+Times the work done before a table reaches the browser: formatting, style
+computation and Arrow serialization (what st.dataframe does with the frame).
+
+Usage: python benchmarks/bench_table_rendering.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import table_rendering
+
+
+def format_currency(value):
+    if pd.isna(value):
+        return "₹0.00"
+    return f"₹{value:,.2f}"
+
+
+def format_percentage(value):
+    if pd.isna(value):
+        return "0.00%"
+    return f"{value:.2f}%"
+
+
+def style_negative_returns(val):
+    """Per-cell styler that parses the formatted string back to a float, as the dashboard used to"""
+    if isinstance(val, str) and '%' in val:
+        try:
+            num_val = float(val.replace('%', ''))
+            if num_val < 0:
+                return 'background-color: #ffebee; color: #c62828'
+            elif num_val > 0:
+                return 'background-color: #e8f5e8; color: #2e7d32'
+        except ValueError:
+            pass
+    return ''
+
+
+def make_detail(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    cost = rng.uniform(100, 100000, rows).round(2)
+    market = (cost * rng.uniform(0.5, 2.0, rows)).round(2)
+    return pd.DataFrame({
+        'Member': rng.choice(['Pavithra', 'Bhuvana', 'Magesh', 'Suchitra'], rows),
+        'Company Name': rng.choice([f"COMPANY {i}" for i in range(500)], rows),
+        'Invested Amount': cost,
+        'Current Value': market,
+        'HPR (%)': (market - cost) / cost * 100
+    })
+
+
+def styler_path(df):
+    formatted = df.copy()
+    formatted['Invested Amount'] = formatted['Invested Amount'].apply(format_currency)
+    formatted['Current Value'] = formatted['Current Value'].apply(format_currency)
+    formatted['HPR (%)'] = formatted['HPR (%)'].apply(format_percentage)
+    styler = formatted.style
+    cell_map = getattr(styler, 'map', None) or styler.applymap
+    styled = cell_map(style_negative_returns, subset=['HPR (%)']).set_properties(
+        **{'text-align': 'right'}, subset=['Invested Amount', 'Current Value', 'HPR (%)']
+    )
+    styled._compute()
+    pa.Table.from_pandas(formatted)
+
+
+def numeric_path(df):
+    styled = table_rendering.style_returns(df, ['HPR (%)'])
+    if styled is not df:
+        styled._compute()
+    pa.Table.from_pandas(df)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = make_detail(rows)
+    # Small enough to stay under the styling limit, so coloring is compared like for like
+    styled_rows = table_rendering.MAX_STYLED_CELLS // len(df.columns)
+    small = df.head(styled_rows)
+
+    print(f"rows: {rows:,}")
+    for label, frame in [(f"{len(small):,} rows (styled)", small), (f"{rows:,} rows", df)]:
+        old = timed(styler_path, frame)
+        new = timed(numeric_path, frame)
+        print(f"{label:>24}: styler {old * 1000:9.1f} ms, numeric {new * 1000:9.1f} ms, {old / new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Synthetic holdings files in both dashboard schemas.
+
+Usage:
+    python benchmarks/generate_portfolio.py holdings 1000000 holdings-1m.csv
+    python benchmarks/generate_portfolio.py transactions 1000000 portfolio-1m.csv
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Cardinalities modelled on a large family office book
+PORTFOLIOS = 8
+BROKERS = 12
+MEMBERS = 400
+SECTORS = 45
+COMPANIES = 4000
+
+SECTOR_NAMES = ['Gold-ETF', 'Silver-ETF', 'Banking', 'IT - Software', 'Chemicals & Fertilisers',
+                'Engineering & Capital Goods', 'Pharmaceuticals', 'FMCG', 'Automobile', 'Power']
+
+
+def _labels(prefix, count):
+    return np.array([f"{prefix} {i:04d}" for i in range(count)], dtype=object)
+
+
+def _sectors():
+    extra = [f"Sector {i:02d}" for i in range(SECTORS - len(SECTOR_NAMES))]
+    return np.array(SECTOR_NAMES + extra, dtype=object)
+
+
+def _amounts(rng, rows):
+    """Lot cost and market value: log-normal costs, a few zero-cost rows, -60%..+250% returns"""
+    qty = rng.integers(1, 500, rows)
+    cost = np.round(qty * rng.lognormal(6, 1.2, rows), 2)
+    cost[rng.random(rows) < 0.002] = 0
+    market = np.round(cost * rng.uniform(0.4, 3.5, rows), 2)
+    return qty, cost, market
+
+
+def _skewed(rng, count, rows):
+    """Zipf-like draw so a few members/companies hold most lots, as in real books"""
+    weights = 1 / np.arange(1, count + 1) ** 0.8
+    return rng.choice(count, size=rows, p=weights / weights.sum())
+
+
+def generate_holdings(rows, seed=0):
+    """Rows in the portfolio-inputs.csv schema (Portfolio, Broker, Member, ...)"""
+    rng = np.random.default_rng(seed)
+    # Each company belongs to one sector
+    company_sector = rng.integers(0, SECTORS, COMPANIES)
+    company = _skewed(rng, COMPANIES, rows)
+    qty, cost, market = _amounts(rng, rows)
+    return pd.DataFrame({
+        'Portfolio': _labels('PF', PORTFOLIOS)[rng.integers(0, PORTFOLIOS, rows)],
+        'Broker': _labels('Broker', BROKERS)[rng.integers(0, BROKERS, rows)],
+        'Member': _labels('Member', MEMBERS)[_skewed(rng, MEMBERS, rows)],
+        'Company Name': _labels('COMPANY', COMPANIES)[company],
+        'Sector': _sectors()[company_sector[company]],
+        'Qty': qty,
+        'Value At Cost': cost,
+        'Value At Market Price': market
+    })
+
+
+def generate_transactions(rows, seed=0):
+    """Rows in the portfolio.csv schema (transaction date, portfolio metrics code, ...)"""
+    rng = np.random.default_rng(seed)
+    company_sector = rng.integers(0, SECTORS, COMPANIES)
+    company_beta = np.round(rng.uniform(0.5, 1.6, COMPANIES), 2)
+    company = _skewed(rng, COMPANIES, rows)
+    qty, cost, market = _amounts(rng, rows)
+    dates = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, rows), unit='D')
+    return pd.DataFrame({
+        'broker name': _labels('Broker', BROKERS)[rng.integers(0, BROKERS, rows)],
+        'family member name': _labels('Member', MEMBERS)[_skewed(rng, MEMBERS, rows)],
+        'stock code': _labels('COMPANY', COMPANIES)[company],
+        'sector code': _sectors()[company_sector[company]],
+        'portfolio metrics code': company_beta[company],
+        'quantity': qty,
+        'invested amount': cost,
+        'current value': market,
+        'transaction date': dates.strftime('%d-%m-%Y')
+    })
+
+
+def add_sales(transactions, fraction=0.3, seed=0):
+    """Append sale rows (negative quantity, proceeds in invested amount) to generated transactions
+
+    Each sale sells part of one earlier lot some days after it was bought, so
+    no holding is ever sold short.
+    """
+    rng = np.random.default_rng(seed)
+    lots = transactions.sample(frac=fraction, random_state=seed)
+    sold = np.maximum(1, (lots['quantity'] * rng.uniform(0.1, 1.0, len(lots))).astype(int))
+    bought = pd.to_datetime(lots['transaction date'], dayfirst=True)
+    price = lots['current value'] / lots['quantity'] * rng.uniform(0.6, 1.4, len(lots))
+    sales = lots.assign(**{
+        'quantity': -sold,
+        'invested amount': np.round(sold * price, 2),
+        'current value': 0.0,
+        'transaction date': (bought + pd.to_timedelta(rng.integers(1, 1500, len(lots)), unit='D')).dt.strftime('%d-%m-%Y')
+    })
+    return pd.concat([transactions, sales], ignore_index=True)
+
+
+def generate_covariance(level='sector', factors=5, seed=0):
+    """Returns/covariance table (asset, mean, one column per asset) over the generated sectors or companies
+
+    Daily returns follow a factor model, so the covariance is positive definite
+    and assets are correlated through a few market factors.
+    """
+    rng = np.random.default_rng(seed)
+    assets = _sectors() if level == 'sector' else _labels('COMPANY', COMPANIES)
+    loadings = rng.normal(0, 0.006, (len(assets), factors))
+    loadings[:, 0] = rng.uniform(0.005, 0.015, len(assets))
+    idiosyncratic = rng.uniform(0.005, 0.02, len(assets)) ** 2
+    covariance = loadings @ loadings.T + np.diag(idiosyncratic)
+    table = pd.DataFrame(covariance, columns=assets)
+    table.insert(0, 'mean', rng.normal(0.0004, 0.0003, len(assets)))
+    table.insert(0, 'asset', assets)
+    return table
+
+
+GENERATORS = {
+    'holdings': generate_holdings,
+    'transactions': generate_transactions
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in GENERATORS:
+        print(__doc__)
+        sys.exit(1)
+    schema, rows, path = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    GENERATORS[schema](rows).to_csv(path, index=False)
+    print(f"Wrote {rows:,} {schema} rows to {path}")
@@ -0,0 +1,150 @@
+"""Memory-mapped binary column store for typed holdings frames.
+
+A store is a directory of immutable versions plus a pointer to the current one:
+
+    v<N>/manifest.json   source signature, row count, column names, kinds and dictionaries
+    v<N>/<i>.npy         one fixed-width array per column
+    CURRENT              name of the current version directory
+
+Numeric and date columns are stored as their fixed-width arrays; text columns
+are dictionary-encoded, storing integer codes in the array and the sorted
+dictionary in the manifest. Opening a store reads the small manifest and maps
+the requested columns with np.load(mmap_mode='r'). Opening costs the same
+whatever the row count, and pages are only read from disk for the columns
+(and rows) actually touched.
+
+A publish writes a complete new version directory and then swaps CURRENT with
+os.replace, so readers see either the old version or the new one, never a mix.
+"""
+import json
+import os
+import shutil
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from parsed_file_cache import path_key
+
+
+@contextmanager
+def publish_lock(directory):
+    """Exclusive lock so concurrent processes do not publish the same store at once"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '.lock'), 'w') as lock_file:
+        try:
+            import fcntl
+        except ImportError:
+            # No advisory locks on this platform; a duplicate publish is wasteful but safe
+            yield
+            return
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def current_version(directory):
+    """Name of the current version directory, or None before the first publish"""
+    try:
+        with open(os.path.join(directory, 'CURRENT')) as f:
+            return f.read().strip() or None
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def read_manifest(directory, version):
+    with open(os.path.join(directory, version, 'manifest.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def is_current(directory, source):
+    """True when the store holds a version published from source as it is now on disk"""
+    version = current_version(directory)
+    if version is None:
+        return False
+    if not os.path.exists(source):
+        return True
+    return read_manifest(directory, version)['source'] == path_key(source)
+
+
+def write_columns(df, directory):
+    """Write each column of df as a .npy array into directory and return the column manifest"""
+    columns = []
+    for position, col in enumerate(df.columns):
+        series = df[col]
+        entry = {'name': col, 'file': f"{position}.npy"}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry['kind'] = 'category'
+            entry['categories'] = series.cat.categories.tolist()
+            values = series.cat.codes.to_numpy()
+        elif series.dtype == object:
+            # Leftover text columns are dictionary-encoded like the dimensions
+            categorical = series.astype('category')
+            entry['kind'] = 'category'
+            entry['categories'] = categorical.cat.categories.tolist()
+            values = categorical.cat.codes.to_numpy()
+        else:
+            entry['kind'] = 'array'
+            values = series.to_numpy()
+        np.save(os.path.join(directory, entry['file']), np.ascontiguousarray(values))
+        columns.append(entry)
+    return columns
+
+
+def read_columns(directory, manifest, columns=None):
+    """Frame of read-only memory-mapped views over the arrays in directory, in columns order"""
+    entries = {entry['name']: entry for entry in manifest['columns']}
+    names = list(entries) if columns is None else [col for col in columns if col in entries]
+    data = {}
+    for name in names:
+        entry = entries[name]
+        values = np.load(os.path.join(directory, entry['file']), mmap_mode='r')
+        if entry['kind'] == 'category':
+            values = pd.Categorical.from_codes(
+                values, dtype=pd.CategoricalDtype(entry['categories']), validate=False
+            )
+        data[name] = values
+    # copy=False keeps each column backed by its mapping instead of consolidating into new blocks
+    return pd.DataFrame(data, copy=False)
+
+
+def publish(df, source, directory):
+    """Write df as a new version of the store in directory, make it current and return its name"""
+    os.makedirs(directory, exist_ok=True)
+    previous = current_version(directory)
+    number = int(previous[1:]) + 1 if previous else 1
+    version = f"v{number}"
+    staging = os.path.join(directory, f".{version}.{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    manifest = {
+        'source': path_key(source),
+        'rows': len(df),
+        'columns': write_columns(df, staging)
+    }
+    with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.rename(staging, os.path.join(directory, version))
+    pointer = os.path.join(directory, f".CURRENT.{os.getpid()}")
+    with open(pointer, 'w') as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(directory, 'CURRENT'))
+    _remove_old_versions(directory, keep={version, previous})
+    return version
+
+
+def _remove_old_versions(directory, keep):
+    """Delete versions other than keep; processes still mapping them keep their pages until they reopen"""
+    for entry in os.listdir(directory):
+        if entry.startswith('v') and entry not in keep:
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+def open_store(directory, columns=None):
+    """Read-only frame over the current version of the store, mapping only the given columns"""
+    version = current_version(directory)
+    if version is None:
+        raise FileNotFoundError(f"No binary store in {directory}")
+    return read_columns(os.path.join(directory, version), read_manifest(directory, version), columns)
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+import dimension_codes
+import lot_matching
+
+# Short-/long-term capital gains classification and estimated tax per member.
+#
+# Every realized piece (lot_matching matches) and every open lot is put in one
+# of four buckets — equity or commodity ETF (Gold-ETF/Silver-ETF sectors),
+# short- or long-term — with boolean masks over the whole book. Each member's
+# net gain per bucket is then a single grouped sum, and loss set-off, the
+# equity LTCG exemption and the rates are applied column by column across
+# all members at once.
+#
+# Rates and thresholds follow the listed-securities rules in force from
+# 23 July 2024 and are estimates before surcharge and cess; commodity ETF
+# short-term gains are taxed at the slab rate, assumed to be the top slab.
+
+COMMODITY_SECTORS = ["Gold-ETF", "Silver-ETF"]
+
+# Held for more than this many days is long-term
+LONG_TERM_DAYS = {"equity": 365, "commodity": 365}
+
+# Buckets in the order losses are set off against them: highest rate first
+BUCKETS = ["commodity short-term", "equity short-term", "equity long-term", "commodity long-term"]
+BUCKET_RATES = np.array([30.0, 20.0, 12.5, 12.5])
+LONG_TERM_BUCKET = np.array([False, False, True, True])
+
+# Equity long-term gains exempt per member per financial year
+LTCG_EXEMPTION = 125_000
+
+# Short-term lots turning long-term within this many days are flagged
+CROSSING_WINDOW_DAYS = 30
+
+
+def financial_year_start(as_of):
+    """1 April of the Indian financial year containing as_of"""
+    as_of = pd.Timestamp(as_of)
+    return pd.Timestamp(as_of.year if as_of.month >= 4 else as_of.year - 1, 4, 1)
+
+
+def _commodity_mask(df):
+    return dimension_codes.isin_mask(df["sector code"], COMMODITY_SECTORS)
+
+
+def classify(held_days, commodity):
+    """Bucket index (into BUCKETS) and days left until long-term, for arrays of holding days"""
+    threshold = np.where(commodity, LONG_TERM_DAYS["commodity"], LONG_TERM_DAYS["equity"])
+    long_term = held_days > threshold
+    bucket = np.where(commodity, np.where(long_term, 3, 0), np.where(long_term, 2, 1))
+    days_to_long_term = np.where(long_term, 0, threshold + 1 - held_days)
+    return bucket, days_to_long_term
+
+
+def classify_lots(open_lots, as_of):
+    """Open lots with their term, tax rate and days until they turn long-term as of a date"""
+    held_days = (pd.Timestamp(as_of) - open_lots["transaction date"]).dt.days.to_numpy()
+    bucket, days_to_long_term = classify(held_days, _commodity_mask(open_lots))
+    lots = open_lots.copy()
+    lots["term"] = np.where(LONG_TERM_BUCKET[bucket], "Long-term", "Short-term")
+    lots["tax rate (%)"] = BUCKET_RATES[bucket]
+    lots["days to long term"] = days_to_long_term
+    return lots
+
+
+def lots_as_of(df, as_of):
+    """(matches, open_lots) of the transactions made up to and including as_of
+
+    Later buys are not yet lots and later sales have not yet consumed any, so
+    open lots are what was held on the date. Their current value is still the
+    latest one in the file: there is no price history.
+    """
+    return lot_matching.match_lots(df[df["transaction date"] <= pd.Timestamp(as_of)])
+
+
+def _bucket_sums(member_codes, bucket, values, n_members, mask=None):
+    """(members x buckets) sums of values"""
+    if mask is not None:
+        member_codes, bucket, values = member_codes[mask], bucket[mask], values[mask]
+    cells = np.bincount(member_codes * len(BUCKETS) + bucket, weights=values, minlength=n_members * len(BUCKETS))
+    return cells.reshape(n_members, len(BUCKETS))
+
+
+def _set_off(net):
+    """Taxable gains per bucket after setting losses off, for a (members x buckets) array of net gains
+
+    Long-term losses only reduce long-term gains; short-term losses reduce any
+    gain. Both go against the highest-rate buckets first.
+    """
+    gains = np.maximum(net, 0)
+    long_loss = -np.minimum(net[:, LONG_TERM_BUCKET], 0).sum(axis=1)
+    short_loss = -np.minimum(net[:, ~LONG_TERM_BUCKET], 0).sum(axis=1)
+    for column in np.flatnonzero(LONG_TERM_BUCKET):
+        used = np.minimum(long_loss, gains[:, column])
+        gains[:, column] -= used
+        long_loss -= used
+    for column in range(len(BUCKETS)):
+        used = np.minimum(short_loss, gains[:, column])
+        gains[:, column] -= used
+        short_loss -= used
+    return gains
+
+
+def _tax(taxable):
+    """Estimated tax per member on (members x buckets) taxable gains, after the equity LTCG exemption"""
+    taxable = taxable.copy()
+    equity_long = BUCKETS.index("equity long-term")
+    taxable[:, equity_long] = np.maximum(taxable[:, equity_long] - LTCG_EXEMPTION, 0)
+    return taxable @ BUCKET_RATES / 100
+
+
+def member_tax(df, as_of, lots=None):
+    """Estimated capital gains tax per member for the financial year containing as_of
+
+    Realized gains are the FIFO matches sold since 1 April. From the open lots
+    it also reports the unrealized losses available to harvest and the tax they
+    would save, the unrealized equity long-term gain that could be booked within
+    the remaining exemption, and the gain on short-term lots turning long-term
+    within CROSSING_WINDOW_DAYS, with the tax saved by waiting. Pass lots, the
+    lots_as_of(df, as_of) result, to reuse an earlier match.
+    """
+    as_of = pd.Timestamp(as_of)
+    matches, open_lots = lots_as_of(df, as_of) if lots is None else lots
+    # Lots with a blank member are taxed under BLANK_LABEL rather than dropped
+    members = pd.Index(sorted(set(dimension_codes.labels_or_blank(df["family member name"]))))
+    n_members = len(members)
+
+    def member_codes(frame):
+        return members.get_indexer(dimension_codes.labels_or_blank(frame["family member name"])).astype("int64")
+
+    # Realized this financial year
+    realized = matches[(matches["sell date"] >= financial_year_start(as_of)) & (matches["sell date"] <= as_of)]
+    bucket, _ = classify(realized["holding period days"].to_numpy(), _commodity_mask(realized))
+    net = _bucket_sums(member_codes(realized), bucket, realized["realized gain"].to_numpy(), n_members)
+    taxable = _set_off(net)
+    tax = _tax(taxable)
+
+    # Open lots, classified as of the date
+    held_days = (as_of - open_lots["transaction date"]).dt.days.to_numpy()
+    bucket, days_to_long_term = classify(held_days, _commodity_mask(open_lots))
+    codes = member_codes(open_lots)
+    unrealized = open_lots["unrealized gain"].to_numpy()
+    losses = _bucket_sums(codes, bucket, unrealized, n_members, mask=unrealized < 0)
+    tax_after_harvest = _tax(_set_off(net + losses))
+
+    equity_long = BUCKETS.index("equity long-term")
+    exemption_left = np.maximum(LTCG_EXEMPTION - taxable[:, equity_long], 0)
+    long_equity_gains = _bucket_sums(codes, bucket, unrealized, n_members, mask=unrealized > 0)[:, equity_long]
+
+    crossing = (unrealized > 0) & ~LONG_TERM_BUCKET[bucket] & (days_to_long_term <= CROSSING_WINDOW_DAYS)
+    crossing_gain = np.bincount(codes[crossing], weights=unrealized[crossing], minlength=n_members)
+    long_bucket = np.where(bucket == 0, 3, 2)
+    waiting_saves = np.bincount(
+        codes[crossing],
+        weights=unrealized[crossing] * (BUCKET_RATES[bucket] - BUCKET_RATES[long_bucket])[crossing] / 100,
+        minlength=n_members
+    )
+
+    summary = pd.DataFrame({
+        "family member name": members,
+        "stcg": net[:, ~LONG_TERM_BUCKET].sum(axis=1),
+        "ltcg": net[:, LONG_TERM_BUCKET].sum(axis=1),
+        "estimated tax": tax,
+        "harvestable loss": np.abs(losses.sum(axis=1)),
+        "tax saved by harvesting losses": tax - tax_after_harvest,
+        "tax-free ltcg to harvest": np.minimum(exemption_left, long_equity_gains),
+        "gain turning long-term soon": crossing_gain,
+        "tax saved by waiting": waiting_saves
+    })
+    return summary
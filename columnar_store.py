@@ -0,0 +1,141 @@
+"""Typed columnar (Parquet) copies of the holdings CSVs.
+
+Run as a script to convert CSVs ahead of time:
+
+    python columnar_store.py portfolio-inputs.csv portfolio.csv
+
+With --binary the CSVs are ingested into memory-mapped binary stores instead
+(see binary_store), which both dashboards open without parsing anything:
+
+    python columnar_store.py --binary portfolio-inputs.csv portfolio.csv
+"""
+import argparse
+import os
+
+import pandas as pd
+
+import binary_store
+import dimension_codes
+
+# Dimension columns of both schemas (portfolio-inputs.csv and portfolio.csv)
+CATEGORY_COLUMNS = [
+    'Portfolio', 'Broker', 'Member', 'Sector', 'Company Name',
+    'broker name', 'family member name', 'stock code', 'sector code'
+]
+NUMERIC_COLUMNS = [
+    'Qty', 'Value At Cost', 'Value At Market Price',
+    'quantity', 'invested amount', 'current value', 'portfolio metrics code'
+]
+# Share counts: kept as integers when every value is whole
+QUANTITY_COLUMNS = ['Qty', 'quantity']
+DATE_COLUMNS = ['transaction date']
+
+
+def columnar_path(csv_path):
+    """Parquet file that sits next to a CSV"""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def binary_path(csv_path):
+    """Binary store directory that sits next to a CSV"""
+    return os.path.splitext(csv_path)[0] + '.colstore'
+
+
+def to_number(values, col):
+    """Numeric column with unparseable values as 0: int64 for whole quantities, else float64"""
+    values = pd.to_numeric(values, errors='coerce').fillna(0).astype('float64')
+    if col in QUANTITY_COLUMNS and (values % 1 == 0).all():
+        return values.astype('int64')
+    return values
+
+
+def apply_schema(df):
+    """Type known columns: categoricals for dimensions, numbers for amounts and quantities, datetimes for dates"""
+    dimension_codes.encode_dimensions(df, CATEGORY_COLUMNS)
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = to_number(df[col], col)
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], dayfirst=True, errors='coerce')
+    return df
+
+
+def convert_csv(csv_path, parquet_path=None):
+    """Convert a holdings CSV into a typed Parquet file and return the typed frame"""
+    parquet_path = parquet_path or columnar_path(csv_path)
+    df = apply_schema(pd.read_csv(csv_path))
+    # Write to a temporary name first so readers never see a half-written file
+    tmp_path = parquet_path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+    return df
+
+
+def ingest_binary(csv_path, store_path=None):
+    """Ingest a holdings CSV into a typed binary store and return the typed frame"""
+    store_path = store_path or binary_path(csv_path)
+    df = apply_schema(pd.read_csv(csv_path))
+    with binary_store.publish_lock(store_path):
+        binary_store.publish(df, csv_path, store_path)
+    return df
+
+
+def is_fresh(csv_path, parquet_path=None):
+    """True when the Parquet copy exists and is at least as new as the CSV"""
+    parquet_path = parquet_path or columnar_path(csv_path)
+    if not os.path.exists(parquet_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+
+
+def _project(available, columns):
+    """Requested columns that exist in the file, in request order"""
+    if columns is None:
+        return None
+    return [col for col in columns if col in available]
+
+
+def load_holdings(csv_path, columns=None):
+    """Load a holdings file, preferring an ingested binary store, then a fresh Parquet copy
+
+    Only the given columns are read. A binary store is memory-mapped and used
+    while it matches the CSV on disk. Otherwise a missing or stale Parquet copy
+    is regenerated from the CSV; if it cannot be written (no Parquet engine,
+    read-only directory) the typed CSV is returned.
+    """
+    store_path = binary_path(csv_path)
+    if binary_store.is_current(store_path, csv_path):
+        return binary_store.open_store(store_path, columns)
+
+    parquet_path = columnar_path(csv_path)
+    if is_fresh(csv_path, parquet_path):
+        try:
+            import pyarrow.parquet as pq
+            available = pq.read_schema(parquet_path).names
+            return pd.read_parquet(parquet_path, columns=_project(available, columns))
+        except Exception:
+            pass
+
+    try:
+        df = convert_csv(csv_path, parquet_path)
+    except (ImportError, OSError):
+        df = apply_schema(pd.read_csv(csv_path))
+
+    projection = _project(df.columns, columns)
+    return df if projection is None else df[projection]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert holdings CSVs into typed columnar files")
+    parser.add_argument('csvs', nargs='+', help="Holdings CSV files")
+    parser.add_argument('--binary', action='store_true', help="Ingest into memory-mapped binary stores instead of Parquet")
+    args = parser.parse_args()
+    for path in args.csvs:
+        if args.binary:
+            converted, target = ingest_binary(path), binary_path(path)
+        else:
+            converted, target = convert_csv(path), columnar_path(path)
+        print(f"{path} -> {target} ({len(converted):,} rows)")
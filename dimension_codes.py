@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+# Dimension columns (Portfolio, Member, Broker, Sector, Company Name, ...) are
+# stored as categoricals whose categories are sorted, so that the integer codes
+# order the same way as the labels. Filters, option lists, groupbys and sorts
+# then work on the int codes instead of hashing and comparing strings.
+
+# Label reported for a blank dimension value where a group needs a name
+BLANK_LABEL = "(blank)"
+
+
+def encode_dimensions(df, columns, dictionary=None):
+    """Encode columns as categoricals in place, sharing dtypes through dictionary ({column: CategoricalDtype})
+
+    Columns already in dictionary reuse its categories so every frame derived
+    from the same file (cube, filtered slices, summaries) shares one set of codes.
+    """
+    if dictionary is None:
+        dictionary = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        if col not in dictionary:
+            labels = df[col].dropna().unique()
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                labels = np.asarray(labels.astype(object))
+            dictionary[col] = pd.CategoricalDtype(sorted(labels, key=str))
+        df[col] = df[col].astype(dictionary[col])
+    return df
+
+
+def labels_or_blank(series):
+    """Values of series as an object array, with BLANK_LABEL for missing ones"""
+    return series.astype(object).fillna(BLANK_LABEL).to_numpy()
+
+
+def code_of(series, value):
+    """Integer code of value in a categorical series, -1 when it is not a category"""
+    categories = series.cat.categories
+    if value not in categories:
+        return -1
+    return categories.get_loc(value)
+
+
+def equals_mask(series, value):
+    """Boolean array for series == value, compared on codes"""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return (series == value).to_numpy()
+    return series.cat.codes.to_numpy() == code_of(series, value)
+
+
+def isin_mask(series, values):
+    """Boolean array for series.isin(values), compared on codes"""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.isin(values).to_numpy()
+    codes = [code_of(series, value) for value in values]
+    return np.isin(series.cat.codes.to_numpy(), [code for code in codes if code >= 0])
+
+
+def options(series, sort=False):
+    """Distinct values present in series, in order of appearance or sorted"""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        values = list(series.dropna().unique())
+        return sorted(values) if sort else values
+    codes = series.cat.codes.to_numpy()
+    present = np.unique(codes) if sort else pd.unique(codes)
+    present = present[present >= 0]
+    return list(series.cat.categories.take(present))
+
+
+def memory_report(df, columns):
+    """Memory in bytes of each column as object strings versus its categorical encoding"""
+    rows = []
+    for col in columns:
+        if col not in df.columns:
+            continue
+        as_object = df[col].astype(object).memory_usage(deep=True, index=False)
+        as_category = df[col].astype('category').memory_usage(deep=True, index=False)
+        rows.append({
+            'Column': col,
+            'Object Bytes': as_object,
+            'Categorical Bytes': as_category,
+            'Reduction (%)': (1 - as_category / as_object) * 100 if as_object else 0.0
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,35 @@
+import hashlib
+import json
+
+import pandas as pd
+
+from parsed_file_cache import ParsedFileCache
+
+# Cache of ready-to-send plotly figures keyed by a hash of the aggregated data
+# that feeds them, the chart type and the language. On a hit the px.* call,
+# the figure validation and the JSON serialization are all skipped; the
+# cached figure dict is handed straight to st.plotly_chart.
+
+figure_cache = ParsedFileCache(max_entries=128, max_bytes=32 * 1024 * 1024)
+
+
+def data_hash(df):
+    """Content hash of a frame: column names plus a row-wise hash of the values"""
+    digest = hashlib.sha256('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def figure_key(chart_type, data, lang):
+    return f"{chart_type}:{lang}:{data_hash(data)}"
+
+
+def cached_figure(chart_type, data, lang, build):
+    """Figure dict for build(data), built and serialized only when data, chart type or language change"""
+    key = figure_key(chart_type, data, lang)
+    figure = figure_cache.get(key)
+    if figure is None:
+        fig_json = build(data).to_json()
+        figure = json.loads(fig_json)
+        figure_cache.put(key, figure, size=len(fig_json))
+    return figure
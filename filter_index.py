@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+import dimension_codes
+
+# Prebuilt per-value row index for the sidebar filter dimensions. For each
+# dimension the row positions are grouped by category code (a CSR-style
+# layout: positions sorted by code plus per-code offsets), so the rows of any
+# value are a contiguous slice. A filter combination becomes a bitmap per
+# active dimension, intersected into one row-position array; the frame itself
+# is only sliced once, when it is needed for display.
+
+
+class FilterIndex:
+    """Row positions of every value of each indexed dimension column"""
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self._columns = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            series = df[col]
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype('category')
+            codes = series.cat.codes.to_numpy()
+            order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+            offsets = np.concatenate([[0], np.cumsum(counts)]) + np.count_nonzero(codes < 0)
+            self._columns[col] = (series, order, offsets)
+
+    def positions_of(self, col, value):
+        """Sorted row positions where col == value"""
+        series, order, offsets = self._columns[col]
+        code = dimension_codes.code_of(series, value)
+        if code < 0:
+            return np.empty(0, dtype=order.dtype)
+        return np.sort(order[offsets[code]:offsets[code + 1]])
+
+    def bitmap(self, col, values):
+        """Boolean row bitmap for col in values"""
+        series, order, offsets = self._columns[col]
+        bits = np.zeros(self.n_rows, dtype=bool)
+        for value in values:
+            code = dimension_codes.code_of(series, value)
+            if code >= 0:
+                bits[order[offsets[code]:offsets[code + 1]]] = True
+        return bits
+
+    def resolve(self, selections):
+        """Row positions matching every selection
+
+        selections maps a column to a single value or a list of values; None,
+        'All' or an empty list leaves that dimension unfiltered.
+        """
+        bits = None
+        for col, selected in selections.items():
+            if selected is None or selected == 'All':
+                continue
+            values = selected if isinstance(selected, (list, tuple, set)) else [selected]
+            if not values:
+                continue
+            col_bits = self.bitmap(col, values)
+            bits = col_bits if bits is None else bits & col_bits
+        if bits is None:
+            return np.arange(self.n_rows)
+        return np.flatnonzero(bits)
+
+
+def sort_positions(df, positions, by):
+    """Reorder row positions by the given columns (categorical codes or values), stably"""
+    keys = []
+    for col in reversed(by):
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            keys.append(series.cat.codes.to_numpy()[positions])
+        else:
+            keys.append(series.to_numpy()[positions])
+    return positions[np.lexsort(keys)]
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+# FIFO lot matching over the portfolio.csv transaction schema. Every buy row is
+# a lot; a sale is a row with a negative quantity (or a 'transaction type' of
+# SELL) whose invested amount holds the sale proceeds.
+#
+# Within each member/broker/stock the lots and the sales are laid out as
+# consecutive intervals on a cumulative-quantity axis, in date order. Under
+# FIFO the k-th unit sold comes out of the k-th unit bought, so a sale is
+# matched to exactly the lots whose intervals overlap its own. Giving every
+# group its own stretch of one global axis turns the whole book into two
+# sorted arrays of interval ends; a single np.unique/np.searchsorted pass over
+# their union yields every (lot, sale) piece without a per-row Python loop.
+#
+# This assumes a holding is never sold short: at any date the quantity sold
+# so far does not exceed the quantity bought so far. Quantity sold beyond
+# everything bought is left unmatched.
+
+LOT_KEYS = ["family member name", "broker name", "stock code"]
+
+# Per-row amounts; every other column (sector, metrics code, ...) describes the
+# stock and is carried from the lot onto its matches
+AMOUNT_COLUMNS = ["quantity", "invested amount", "current value", "transaction date", "holding period days"]
+
+# Quantities are matched in integer units of 1/QUANTITY_SCALE share so that
+# interval ends computed along different cumulative sums compare exactly
+QUANTITY_SCALE = 10_000
+
+
+def sale_mask(df):
+    """Boolean array marking sale rows"""
+    if "transaction type" in df.columns:
+        return df["transaction type"].astype(str).str.upper().eq("SELL").to_numpy()
+    return df["quantity"].to_numpy(dtype="float64") < 0
+
+
+def _sum_units(index, units, length):
+    """Integer units summed per index; float64 sums are exact well past any realistic book"""
+    return np.rint(np.bincount(index, weights=units, minlength=length)).astype("int64")
+
+
+def _intervals(group, qty, group_offset):
+    """(start, end) of each row's interval on the global axis; rows are sorted by group"""
+    ends = np.cumsum(qty)
+    # Restart the running total at each group boundary
+    group_start = np.r_[0, np.flatnonzero(np.diff(group)) + 1]
+    before_group = np.r_[0, ends][group_start]
+    counts = np.diff(np.r_[group_start, len(group)])
+    ends = ends - np.repeat(before_group, counts) + group_offset[group]
+    return ends - qty, ends
+
+
+def match_lots(df, keys=LOT_KEYS):
+    """Match sales to lots FIFO, returning (matches, open_lots)
+
+    matches has one row per piece of a lot consumed by a sale, with its cost
+    basis, proceeds, realized gain and holding period. open_lots has one row
+    per lot with quantity left, its remaining cost basis, current value and
+    unrealized gain. The current value of what is left is prorated from the
+    lot row's own current value.
+    """
+    sale = sale_mask(df)
+    quantity = np.abs(df["quantity"].to_numpy(dtype="float64"))
+    units = np.rint(quantity * QUANTITY_SCALE).astype("int64")
+    amount = np.abs(df["invested amount"].to_numpy(dtype="float64"))
+    # A blank member, broker or stock is a key of its own, not a dropped row
+    group = df.groupby(keys, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+    dates = df["transaction date"].to_numpy()
+
+    # Date order within each group, buys before sales on the same day
+    order = np.lexsort((sale, dates, group))
+    buys = order[~sale[order]]
+    sells = order[sale[order]]
+
+    # Each group gets a stretch of the axis as long as its larger side
+    n_groups = group.max() + 1 if len(group) else 0
+    bought = _sum_units(group[buys], units[buys], n_groups)
+    sold = _sum_units(group[sells], units[sells], n_groups)
+    group_offset = np.r_[0, np.cumsum(np.maximum(bought, sold))][:n_groups]
+
+    buy_start, buy_end = _intervals(group[buys], units[buys], group_offset)
+    sell_start, sell_end = _intervals(group[sells], units[sells], group_offset)
+
+    # Every boundary on the axis; each piece between two is inside at most one lot and one sale
+    bounds = np.sort(np.concatenate([buy_start, buy_end, sell_start, sell_end]))
+    bounds = bounds[np.r_[True, bounds[1:] != bounds[:-1]]]
+    piece_start, piece_end = bounds[:-1], bounds[1:]
+    lot = np.searchsorted(buy_end, piece_start, side="right")
+    sale_of = np.searchsorted(sell_end, piece_start, side="right")
+    inside = np.flatnonzero((lot < len(buys)) & (sale_of < len(sells)))
+    lot, sale_of, piece_start, piece_end = lot[inside], sale_of[inside], piece_start[inside], piece_end[inside]
+    matched = (
+        (buy_start[lot] <= piece_start) & (sell_start[sale_of] <= piece_start)
+        & (group[buys][lot] == group[sells][sale_of])
+    )
+    lot, sale_of = lot[matched], sale_of[matched]
+    piece_units = (piece_end - piece_start)[matched]
+    piece_qty = piece_units / QUANTITY_SCALE
+
+    buy_rows, sell_rows = buys[lot], sells[sale_of]
+    cost_basis = piece_qty * amount[buy_rows] / quantity[buy_rows]
+    proceeds = piece_qty * amount[sell_rows] / quantity[sell_rows]
+    labels = [col for col in df.columns if col not in AMOUNT_COLUMNS]
+    matches = df.iloc[buy_rows][labels].reset_index(drop=True)
+    matches["buy date"] = dates[buy_rows]
+    matches["sell date"] = dates[sell_rows]
+    matches["quantity"] = piece_qty
+    matches["cost basis"] = cost_basis
+    matches["proceeds"] = proceeds
+    matches["realized gain"] = proceeds - cost_basis
+    matches["holding period days"] = (matches["sell date"] - matches["buy date"]).dt.days
+
+    # What is left of each lot after its matched sales
+    consumed = _sum_units(lot, piece_units, len(buys))
+    remaining_units = units[buys] - consumed
+    remaining = remaining_units / QUANTITY_SCALE
+    share = np.divide(remaining_units, units[buys], out=np.zeros(len(buys)), where=units[buys] > 0)
+    open_lots = df.iloc[buys].reset_index(drop=True)
+    open_lots["quantity"] = remaining
+    open_lots["invested amount"] = amount[buys] * share
+    open_lots["current value"] = df["current value"].to_numpy(dtype="float64")[buys] * share
+    open_lots["unrealized gain"] = open_lots["current value"] - open_lots["invested amount"]
+    open_lots = open_lots[remaining > 0].reset_index(drop=True)
+    return matches, open_lots
+
+
+def unsold_share(df, keys=LOT_KEYS):
+    """Fraction of each row still held after FIFO matching: 0 for sales, 1 for lots nothing was sold from"""
+    sale = sale_mask(df)
+    if not sale.any():
+        return np.ones(len(df))
+    rows = np.arange(len(df))
+    matches, _ = match_lots(df.reset_index(drop=True).assign(row=rows), keys)
+    units = np.rint(np.abs(df["quantity"].to_numpy(dtype="float64")) * QUANTITY_SCALE)
+    sold = np.rint(np.bincount(matches["row"], weights=matches["quantity"] * QUANTITY_SCALE, minlength=len(df)))
+    share = np.divide(units - sold, units, out=np.zeros(len(df)), where=units > 0)
+    return np.where(sale, 0.0, share)
+
+
+def gains_summary(matches, open_lots, group_field):
+    """Realized and unrealized gains per group_field value, with a grand total row"""
+    realized = matches.groupby(group_field, observed=True, dropna=False)["realized gain"].sum()
+    unrealized = open_lots.groupby(group_field, observed=True, dropna=False)["unrealized gain"].sum()
+    summary = pd.concat([realized, unrealized], axis=1).fillna(0).reset_index()
+    summary["total gain"] = summary["realized gain"] + summary["unrealized gain"]
+    total = summary[["realized gain", "unrealized gain", "total gain"]].sum()
+    total[group_field] = "Total"
+    return pd.concat([summary, total.to_frame().T], ignore_index=True)
@@ -1,11 +1,15 @@
 import streamlit as st
 import pandas as pd
 import json
-import plotly.express as px
-import plotly.io as pio
-from io import BytesIO
-from fpdf import FPDF
-from datetime import datetime
+import returns_engine
+import lot_matching
+import capital_gains
+import risk_metrics
+import portfolio_core
+import table_rendering
+import stage_timer
+import dimension_codes
+from filter_index import FilterIndex
 
 # Load translation
 @st.cache_data
@@ -14,14 +18,13 @@ def load_translations(language):
         translations = json.load(f)
     return translations.get(language, translations["English"])
 
-# Load CSV data
-@st.cache_data
-def load_data():
-    url = "https://raw.githubusercontent.com/your-username/your-repo/main/data/portfolio.csv"  # Replace with your actual GitHub raw link
-    df = pd.read_csv("portfolio.csv")
-    df["transaction date"] = pd.to_datetime(df["transaction date"])
-    df["holding period days"] = (pd.Timestamp.today() - df["transaction date"]).dt.days
-    return df
+# Load CSV data: one read-only copy per server process, shared by every session
+# and reloaded when the file changes; filtering below always works on copies
+dataset = portfolio_core.shared_transactions("portfolio.csv")
+
+# Filter index over the loaded data, rebuilt only when the file is reloaded
+def load_filter_index():
+    return dataset.resource("filter_index", lambda df: FilterIndex(df, portfolio_core.TRANSACTION_FILTER_COLUMNS))
 
 # Translate UI elements
 def t(key, lang_dict):
@@ -33,8 +36,11 @@ language = st.sidebar.selectbox("Select Language", ["English", "Tamil"])
 lang_dict = load_translations(language)
 
 # Main dashboard
+timings = stage_timer.begin_run('orchidDashboardStock')
 st.title(t("Stock Portfolio Dashboard", lang_dict))
-data = load_data()
+with timings.stage("load") as stage:
+    data, _ = dataset.snapshot()
+    stage.rows_out = len(data)
 
 # Filter selection options
 st.sidebar.subheader(t("Filter Portfolio", lang_dict))
@@ -49,26 +55,29 @@ if "filters_applied" not in st.session_state or reset_filters:
     }
 
 st.session_state.filters_applied["family"] = st.sidebar.multiselect(
-    t("Family Member", lang_dict), options=sorted(data["family member name"].unique()), default=st.session_state.filters_applied["family"])
+    t("Family Member", lang_dict), options=dimension_codes.options(data["family member name"], sort=True), default=st.session_state.filters_applied["family"])
 
 st.session_state.filters_applied["broker"] = st.sidebar.multiselect(
-    t("Broker", lang_dict), options=sorted(data["broker name"].unique()), default=st.session_state.filters_applied["broker"])
+    t("Broker", lang_dict), options=dimension_codes.options(data["broker name"], sort=True), default=st.session_state.filters_applied["broker"])
 
 st.session_state.filters_applied["sector"] = st.sidebar.multiselect(
-    t("Sector", lang_dict), options=sorted(data["sector code"].unique()), default=st.session_state.filters_applied["sector"])
+    t("Sector", lang_dict), options=dimension_codes.options(data["sector code"], sort=True), default=st.session_state.filters_applied["sector"])
 
 st.session_state.filters_applied["stock"] = st.sidebar.multiselect(
-    t("Stock Code", lang_dict), options=sorted(data["stock code"].unique()), default=st.session_state.filters_applied["stock"])
-
-# Apply filters
-if st.session_state.filters_applied["family"]:
-    data = data[data["family member name"].isin(st.session_state.filters_applied["family"])]
-if st.session_state.filters_applied["broker"]:
-    data = data[data["broker name"].isin(st.session_state.filters_applied["broker"])]
-if st.session_state.filters_applied["sector"]:
-    data = data[data["sector code"].isin(st.session_state.filters_applied["sector"])]
-if st.session_state.filters_applied["stock"]:
-    data = data[data["stock code"].isin(st.session_state.filters_applied["stock"])]
+    t("Stock Code", lang_dict), options=dimension_codes.options(data["stock code"], sort=True), default=st.session_state.filters_applied["stock"])
+
+# Apply filters: resolve all selections to one row-position array
+filter_columns = {
+    "family": "family member name",
+    "broker": "broker name",
+    "sector": "sector code",
+    "stock": "stock code"
+}
+with timings.stage("filter", rows_in=len(data)) as stage:
+    selections = {col: st.session_state.filters_applied[key] for key, col in filter_columns.items()}
+    if any(selections.values()):
+        data = portfolio_core.filter_holdings(data, selections, index=load_filter_index())
+    stage.rows_out = len(data)
 
 # Selection options
 sort_options = {
@@ -82,73 +91,109 @@ sort_choice = st.selectbox(t("Sort Portfolio By", lang_dict), list(sort_options.
 sort_field = sort_options[sort_choice]
 
 # Sort data
-sorted_data = data.sort_values(by=[sort_field])
+with timings.stage("sort", rows_in=len(data)):
+    sorted_data = data.sort_values(by=[sort_field])
 
 # Summary section (moved to top)
 st.subheader(t("Summary by", lang_dict) + f" {sort_choice}")
-summary = sorted_data.groupby(sort_field).agg({
-    "invested amount": "sum",
-    "current value": "sum"
-}).reset_index()
-
-summary["return_raw"] = ((summary["current value"] - summary["invested amount"]) / summary["invested amount"]) * 100
-summary["invested amount"] = summary["invested amount"].apply(lambda x: f"₹{x:,.0f}")
-summary["current value"] = summary["current value"].apply(lambda x: f"₹{x:,.0f}")
-summary["return (%)"] = summary["return_raw"].apply(lambda x: f"{x:.2f}%")
-summary = summary.drop(columns="return_raw")
-
-# Add total row
-total_row = {sort_field: "Total",
-             "invested amount": f"₹{data['invested amount'].sum():,.0f}",
-             "current value": f"₹{data['current value'].sum():,.0f}",
-             "return (%)": f"{((data['current value'].sum() - data['invested amount'].sum()) / data['invested amount'].sum()) * 100:.2f}%"}
-summary = pd.concat([summary, pd.DataFrame([total_row])], ignore_index=True)
-
-summary.index = summary.index + 1
-summary.reset_index(inplace=True)
-summary.rename(columns={"index": "S.No"}, inplace=True)
-st.dataframe(summary)
-
-# Display sorted data with formatting
+with timings.stage("aggregate", rows_in=len(sorted_data)) as stage:
+    # One FIFO match gives every row's unsold share: sales and sold lots are
+    # not open positions, while XIRR still counts their cash flows
+    share = lot_matching.unsold_share(sorted_data)
+    positions = portfolio_core.open_positions(sorted_data, share)
+    group_summary, summary = portfolio_core.summarize_transactions(sorted_data, sort_field, share)
+    stage.rows_out = len(group_summary)
+
+with timings.stage("format/style summary", rows_in=len(summary)):
+    summary.index = summary.index + 1
+    summary.reset_index(inplace=True)
+    summary.rename(columns={"index": "S.No"}, inplace=True)
+    table_rendering.render_table(summary, currency_cols=["invested amount", "current value"], percent_cols=["return (%)", "xirr (%)"],
+                                 currency_format="₹%,.0f")
+
+# Realized and unrealized gains: sales are matched to earlier lots FIFO, so
+# only what is still held counts as an open position
+st.subheader(t("Realized and Unrealized Gains by", lang_dict) + f" {sort_choice}")
+with timings.stage("lot matching", rows_in=len(data)) as stage:
+    matches, open_lots = lot_matching.match_lots(data)
+    gains = lot_matching.gains_summary(matches, open_lots, sort_field)
+    stage.rows_out = len(matches) + len(open_lots)
+table_rendering.render_table(gains, currency_cols=["realized gain", "unrealized gain", "total gain"],
+                             currency_format="₹%,.0f")
+
+# Estimated capital gains tax per member over the whole book (tax is per
+# person, so family member is the only filter applied). Lots are matched over
+# the transactions up to the as-of date, cached per date
+st.subheader(t("Capital Gains Tax", lang_dict))
+today = pd.Timestamp.today().date()
+tax_as_of = pd.Timestamp(st.date_input(t("Tax as of", lang_dict), value=today, max_value=today))
+with timings.stage("capital gains tax") as stage:
+    book_lots = dataset.resource(f"lots:{tax_as_of:%Y-%m-%d}", lambda df: capital_gains.lots_as_of(df, tax_as_of))
+    member_tax = dataset.resource(
+        f"capital_gains:{tax_as_of:%Y-%m-%d}",
+        lambda df: capital_gains.member_tax(df, tax_as_of, lots=book_lots)
+    )
+    if st.session_state.filters_applied["family"]:
+        member_tax = member_tax[member_tax["family member name"].isin(st.session_state.filters_applied["family"])]
+    stage.rows_out = len(member_tax)
+table_rendering.render_table(member_tax, currency_cols=list(member_tax.columns[1:]), currency_format="₹%,.0f")
+with st.expander(t("Open lots by term", lang_dict)):
+    lots_held = capital_gains.lots_as_of(data, tax_as_of)[1] if any(selections.values()) else book_lots[1]
+    lots_by_term = capital_gains.classify_lots(lots_held, tax_as_of)
+    st.dataframe(lots_by_term.groupby(["term", "sector code"], observed=True)[["quantity", "invested amount", "unrealized gain"]].sum())
+
+# Display the open positions in sort order, highlighting negative returns
 st.subheader(t("Detailed Portfolio Data", lang_dict))
-display_data = sorted_data.copy()
-display_data["invested amount"] = display_data["invested amount"].apply(lambda x: f"₹{x:,.0f}")
-display_data["current value"] = display_data["current value"].apply(lambda x: f"₹{x:,.0f}")
-display_data["return (%)"] = ((sorted_data["current value"] - sorted_data["invested amount"]) / sorted_data["invested amount"]) * 100
-display_data["return (%)"] = display_data["return (%)"].apply(lambda x: f"{x:.2f}%")
-
-# Highlight negative returns
-def highlight_negative(val):
-    try:
-        return 'color: red' if float(val.replace('%','')) < 0 else ''
-    except:
-        return ''
+with timings.stage("format/style detail", rows_in=len(positions)):
+    display_data = positions.assign(**{"return (%)": returns_engine.hpr(positions["current value"], positions["invested amount"])})
+    table_rendering.render_table(display_data, currency_cols=["invested amount", "current value"], percent_cols=["return (%)"],
+                                 return_cols=["return (%)"], currency_format="₹%,.0f",
+                                 negative_style='color: red', positive_style='')
 
-st.dataframe(display_data.style.applymap(highlight_negative, subset=["return (%)"]))
+# Charts are below the fold; plotly.express is only imported once the tables are out
+import plotly.express as px
 
 # Pie chart of current value distribution
 st.subheader(t("Current Value Distribution", lang_dict))
-pie_chart = px.pie(summary, names=sort_field, values="current value", title=t("Current Value Distribution", lang_dict))
-st.plotly_chart(pie_chart)
+with timings.stage("pie chart"):
+    pie_chart = px.pie(group_summary, names=sort_field, values="current value", title=t("Current Value Distribution", lang_dict))
+    st.plotly_chart(pie_chart)
 
 # Bar chart of return percentage
 st.subheader(t("Return Percentage by", lang_dict) + f" {sort_choice}")
-bar_chart = px.bar(summary, x=sort_field, y="return (%)", title=t("Return Percentage by", lang_dict) + f" {sort_choice}",
-                   color="return (%)", color_continuous_scale="Blues")
-st.plotly_chart(bar_chart)
-
-# Average beta / correlation metrics
+with timings.stage("return chart"):
+    bar_chart = px.bar(group_summary, x=sort_field, y="return (%)", title=t("Return Percentage by", lang_dict) + f" {sort_choice}",
+                       color="return (%)", color_continuous_scale="Blues")
+    st.plotly_chart(bar_chart)
+
+# Value-weighted beta / correlation metrics over the open positions: every
+# grouping comes from one weighted-sum pass, shared across sessions when no
+# filter is applied
 if "portfolio metrics code" in data.columns:
-    st.subheader(t("Average Portfolio Metrics", lang_dict))
-    avg_metrics = data.groupby(sort_field)["portfolio metrics code"].mean().reset_index()
-    avg_metrics.columns = [sort_field, "average metrics"]
-    st.dataframe(avg_metrics)
-
-    metrics_bar = px.bar(avg_metrics, x=sort_field, y="average metrics",
-                         title=t("Average Portfolio Metrics by", lang_dict) + f" {sort_choice}",
-                         color="average metrics", color_continuous_scale="Greens")
-    st.plotly_chart(metrics_bar)
+    st.subheader(t("Weighted Portfolio Metrics", lang_dict))
+    with timings.stage("metrics", rows_in=len(data)):
+        if any(selections.values()):
+            weighted = risk_metrics.WeightedMetrics(positions, portfolio_core.TRANSACTION_FILTER_COLUMNS)
+        else:
+            weighted = dataset.resource(
+                "risk_metrics",
+                lambda df: risk_metrics.WeightedMetrics(portfolio_core.open_positions(df), portfolio_core.TRANSACTION_FILTER_COLUMNS)
+            )
+        weighted_metrics = weighted.weighted(sort_field)
+        st.dataframe(weighted_metrics)
+
+        metrics_bar = px.bar(weighted_metrics, x=sort_field, y="weighted portfolio metrics code",
+                             title=t("Weighted Portfolio Metrics by", lang_dict) + f" {sort_choice}",
+                             color="weighted portfolio metrics code", color_continuous_scale="Greens")
+        st.plotly_chart(metrics_bar)
 
 # Show full data toggle
 if st.checkbox(t("Show Full Data", lang_dict)):
     st.write(data)
+
+# Optional per-stage timing panel
+if st.sidebar.checkbox("Show stage timings", value=False):
+    stage_timer.render_panel(timings)
+stage_timer.track_session(dataset)
+if st.sidebar.checkbox("Show memory usage", value=False):
+    stage_timer.render_memory_panel(dataset)
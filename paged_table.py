@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+import returns_engine
+
+# Paginated detail view. The sort order is kept server-side as an array of
+# row positions into the (already filtered) frame; only the visible page, plus
+# a small prefetch window of following pages, is ever sliced out and handed to
+# the table renderer. Changing the sort column re-sorts positions only — no
+# row is copied or formatted until it is on a page.
+
+
+class PagedView:
+    """Sorted, paginated access to the rows of a frame"""
+
+    def __init__(self, df, page_size=100, prefetch_pages=1, max_cached_pages=8):
+        self.df = df
+        self.page_size = page_size
+        self.prefetch_pages = prefetch_pages
+        self.max_cached_pages = max_cached_pages
+        self.order = np.arange(len(df))
+        self.sort_key = None
+        self._orders = {None: self.order}
+        self._pages = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def n_pages(self):
+        return max(1, -(-len(self.df) // self.page_size))
+
+    def _sort_values(self, column):
+        """Array to sort column by: category codes for categoricals, HPR derived on demand"""
+        if column == 'HPR' and 'HPR' not in self.df.columns:
+            return returns_engine.hpr(
+                self.df['Value At Market Price'].to_numpy(), self.df['Value At Cost'].to_numpy()
+            )
+        series = self.df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.cat.codes.to_numpy()
+        return series.to_numpy()
+
+    def sort(self, column=None, ascending=True):
+        """Order rows by column (None keeps the frame's own order); orders are cached per key"""
+        key = None if column is None else (column, ascending)
+        if key == self.sort_key:
+            return self
+        if key not in self._orders:
+            values = self._sort_values(column)
+            if ascending:
+                self._orders[key] = np.argsort(values, kind='stable')
+            else:
+                # Reverse of a stable ascending sort on the reversed array keeps ties in frame order
+                reversed_order = np.argsort(values[::-1], kind='stable')[::-1]
+                self._orders[key] = len(values) - 1 - reversed_order
+        self.order = self._orders[key]
+        self.sort_key = key
+        self._pages = {}
+        return self
+
+    def set_page_size(self, page_size):
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self._pages = {}
+        return self
+
+    def page_bounds(self, number):
+        """First and last (exclusive) row of a 1-based page number"""
+        number = min(max(1, number), self.n_pages)
+        start = (number - 1) * self.page_size
+        return start, min(start + self.page_size, len(self.df))
+
+    def _slice(self, number):
+        start, end = self.page_bounds(number)
+        return self.df.take(self.order[start:end])
+
+    def page(self, number):
+        """Rows of a 1-based page number, prefetching the pages that follow"""
+        number = min(max(1, number), self.n_pages)
+        if number not in self._pages:
+            self._pages[number] = self._slice(number)
+        for ahead in range(number + 1, min(number + self.prefetch_pages, self.n_pages) + 1):
+            if ahead not in self._pages:
+                self._pages[ahead] = self._slice(ahead)
+        # Keep the cache to the pages nearest the one being viewed
+        while len(self._pages) > self.max_cached_pages:
+            farthest = max(self._pages, key=lambda cached: abs(cached - number))
+            del self._pages[farthest]
+        return self._pages[number]
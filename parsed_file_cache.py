@@ -0,0 +1,119 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Process-wide LRU cache of parsed and cleaned holdings files. Streamlit
+# re-executes the script on every widget interaction, but imported modules
+# survive between reruns, so a cache held here means a file is parsed once
+# per distinct content instead of once per click.
+
+
+def bytes_key(data):
+    """Cache key for uploaded file contents"""
+    return 'sha256:' + hashlib.sha256(data).hexdigest()
+
+
+def path_key(path):
+    """Cache key for a file on disk, invalidated when its mtime or size changes"""
+    stat = os.stat(path)
+    return f"path:{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def estimate_size(value, seen=None):
+    """Approximate memory footprint of a value in bytes, counting shared objects once"""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(item, seen) for item in value)
+    if isinstance(value, dict):
+        return sum(estimate_size(item, seen) for item in value.values())
+    if hasattr(value, '__dict__') and not callable(value):
+        # Plain holder objects (indexes, paged views): sum their attributes
+        return estimate_size(vars(value), seen)
+    return 0
+
+
+class ParsedFileCache:
+    """LRU cache bounded by both entry count and total memory"""
+
+    def __init__(self, max_entries=8, max_bytes=512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Cached value for key, or None on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, size=None):
+        """Store value under key, evicting old entries as needed; size defaults to an estimate"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = estimate_size(value) if size is None else size
+            self._evict()
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() to build it on a miss"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        # Parse outside the lock so other sessions are not blocked
+        value = loader()
+        self.put(key, value)
+        return value
+
+    def _evict(self):
+        """Drop least recently used entries until both bounds hold, always keeping the newest"""
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.total_bytes() > self.max_bytes
+        ):
+            key, _ = self._entries.popitem(last=False)
+            self._sizes.pop(key, None)
+            self.evictions += 1
+
+    def total_bytes(self):
+        return sum(self._sizes.values())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+
+    def stats(self):
+        """Hit/miss/eviction counters and current usage"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+parsed_file_cache = ParsedFileCache()
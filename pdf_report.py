@@ -0,0 +1,143 @@
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from parsed_file_cache import ParsedFileCache
+
+# PDF export of the dashboard tables and charts. Rasterizing plotly figures
+# through kaleido is the slow part (each call drives a headless browser), so
+# figures are rendered in a worker pool and the PNGs are cached by a hash of
+# the figure JSON: re-exporting unchanged charts costs nothing.
+
+# Core PDF fonts only cover latin-1, so Tamil labels would print as '?'; the
+# report's titles and column headers always use this language
+PDF_LANG = 'en'
+
+image_cache = ParsedFileCache(max_entries=64, max_bytes=64 * 1024 * 1024)
+
+_pool = None
+
+
+def _get_pool():
+    """Lazily started process pool shared by every export in this process"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        atexit.register(_pool.shutdown, wait=False)
+    return _pool
+
+
+def figure_hash(fig_json, width, height):
+    """Cache key of a figure rendered at a given size"""
+    return hashlib.sha256(f"{width}x{height}:{fig_json}".encode('utf-8')).hexdigest()
+
+
+def _render_png(fig_json, width, height):
+    """Worker: rasterize one figure (as JSON) to PNG bytes"""
+    import plotly.io as pio
+    return pio.to_image(pio.from_json(fig_json), format='png', width=width, height=height)
+
+
+def render_figures(figures, width=900, height=500):
+    """PNG bytes for each figure (a plotly Figure or figure dict), rendering cache misses in parallel"""
+    jobs = [(json.dumps(fig) if isinstance(fig, dict) else fig.to_json(), width, height) for fig in figures]
+    keys = [figure_hash(*job) for job in jobs]
+
+    images = {}
+    pending = {}
+    for key, job in zip(keys, jobs):
+        if key in images or key in pending:
+            continue
+        cached = image_cache.get(key)
+        if cached is not None:
+            images[key] = cached
+        else:
+            pending[key] = job
+
+    if len(pending) == 1:
+        # Not worth a round trip through the pool
+        key, job = next(iter(pending.items()))
+        images[key] = _render_png(*job)
+        image_cache.put(key, images[key])
+    elif pending:
+        pool = _get_pool()
+        futures = {key: pool.submit(_render_png, *job) for key, job in pending.items()}
+        for key, future in futures.items():
+            images[key] = future.result()
+            image_cache.put(key, images[key])
+
+    return [images[key] for key in keys]
+
+
+def _latin1(text):
+    """Core PDF fonts are latin-1 only; spell out the rupee sign and replace anything else"""
+    return str(text).replace('₹', 'Rs. ').encode('latin-1', errors='replace').decode('latin-1')
+
+
+def _format_cell(value):
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return _latin1(value)
+
+
+def _add_table(pdf, title, df, max_rows):
+    """Write df as a simple grid table, truncated to max_rows"""
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 8, _latin1(title), ln=1)
+
+    col_width = (pdf.w - pdf.l_margin - pdf.r_margin) / max(1, len(df.columns))
+    pdf.set_font('Arial', 'B', 8)
+    for col in df.columns:
+        pdf.cell(col_width, 6, _latin1(col)[:30], border=1)
+    pdf.ln()
+
+    pdf.set_font('Arial', '', 8)
+    for row in df.head(max_rows).itertuples(index=False):
+        for value in row:
+            pdf.cell(col_width, 5, _format_cell(value)[:30], border=1)
+        pdf.ln()
+    if len(df) > max_rows:
+        pdf.set_font('Arial', 'I', 8)
+        pdf.cell(0, 6, f"... {len(df) - max_rows:,} more rows not shown", ln=1)
+    pdf.ln(4)
+
+
+def build_pdf(title, summary, detail, figures, max_detail_rows=1000):
+    """Render the summary and (optional) detail tables and the figures into PDF bytes"""
+    from fpdf import FPDF
+
+    images = render_figures(figures)
+
+    pdf = FPDF(orientation='L', unit='mm', format='A4')
+    pdf.set_auto_page_break(auto=True, margin=10)
+    pdf.add_page()
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 10, _latin1(title), ln=1)
+    pdf.set_font('Arial', '', 9)
+    pdf.cell(0, 6, f"Generated {pd.Timestamp.now():%Y-%m-%d %H:%M}", ln=1)
+    pdf.ln(2)
+
+    _add_table(pdf, 'Summary', summary, max_rows=len(summary))
+    if detail is not None:
+        _add_table(pdf, 'Details', detail, max_rows=max_detail_rows)
+
+    # FPDF 1.7 only places images from files
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        image_width = (pdf.w - pdf.l_margin - pdf.r_margin) / 2 - 2
+        for i, png in enumerate(images):
+            if i % 4 == 0:
+                pdf.add_page()
+            path = os.path.join(tmp_dir, f"chart-{i}.png")
+            with open(path, 'wb') as f:
+                f.write(png)
+            x = pdf.l_margin + (i % 2) * (image_width + 4)
+            y = 15 + ((i % 4) // 2) * (image_width * 500 / 900 + 4)
+            pdf.image(path, x=x, y=y, w=image_width)
+
+    out = pdf.output(dest='S')
+    return out.encode('latin-1') if isinstance(out, str) else bytes(out)
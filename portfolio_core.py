@@ -0,0 +1,345 @@
+"""Core portfolio analytics shared by the dashboards, batch reports and benchmarks.
+
+Pure pandas/NumPy: importing this module does not import Streamlit or plotly,
+so batch jobs and services start without the UI stack.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+import aggregation_cube
+import columnar_store
+import dimension_codes
+import lot_matching
+import returns_engine
+from filter_index import FilterIndex, sort_positions
+from parsed_file_cache import parsed_file_cache, bytes_key, path_key
+import shared_store
+from shared_dataset import shared_dataset
+from streaming_ingest import stream_aggregate
+
+REQUIRED_COLUMNS = ['Portfolio', 'Broker', 'Member', 'Company Name', 'Sector', 'Qty', 'Value At Cost', 'Value At Market Price']
+
+# Multi-language support
+def load_translations():
+    translations = {
+        "en": {
+            "title": "Stock Portfolio Dashboard",
+            "upload_file": "Upload CSV File",
+            "portfolio_filter": "Portfolio Filter",
+            "member_filter": "Member Filter",
+            "broker_filter": "Broker Filter",
+            "sector_filter": "Sector Filter",
+            "summary_table": "Portfolio Summary",
+            "detail_table": "Portfolio Details",
+            "charts": "Portfolio Analysis Charts",
+            "member": "Member",
+            "broker": "Broker",
+            "company_name": "Company Name",
+            "sector": "Sector",
+            "investment": "Investment",
+            "current_value": "Current Value",
+            "hpr": "HPR (%)",
+            "quantity": "Quantity",
+            "invested_amount": "Invested Amount",
+            "holding_period": "Holding Period",
+            "portfolio_distribution": "Portfolio Distribution by Sector",
+            "member_performance": "Member-wise Performance",
+            "broker_comparison": "Broker-wise Comparison",
+            "top_performers": "Top Performing Stocks",
+            "language": "Language",
+            "sort_by": "Sort By",
+            "stock_code": "Stock Code",
+            "summarize_by": "Summarize By",
+            "default_file": "Default File"
+        },
+        "ta": {
+            "title": "பங்கு போர்ட்ஃபோலியோ டாஷ்போர்டு",
+            "upload_file": "CSV கோப்பை பதிவேற்றுக",
+            "portfolio_filter": "போர்ட்ஃபோலியோ வடிகட்டி",
+            "member_filter": "உறுப்பினர் வடிகட்டி",
+            "broker_filter": "தரகர் வடிகட்டி",
+            "sector_filter": "துறை வடிகட்டி",
+            "summary_table": "போர்ட்ஃபோலியோ சுருக்கம்",
+            "detail_table": "போர்ட்ஃபோலியோ விவரங்கள்",
+            "charts": "போர்ட்ஃபோலியோ பகுப்பாய்வு விளக்கப்படங்கள்",
+            "member": "உறுப்பினர்",
+            "broker": "தரகர்",
+            "company_name": "நிறுவன பெயர்",
+            "sector": "துறை",
+            "investment": "முதலீடு",
+            "current_value": "தற்போதைய மதிப்பு",
+            "hpr": "HPR (%)",
+            "quantity": "அளவு",
+            "invested_amount": "முதலீட்டு தொகை",
+            "holding_period": "வைத்திருக்கும் காலம்",
+            "portfolio_distribution": "துறை வாரியாக போர்ட்ஃபோலியோ விநியோகம்",
+            "member_performance": "உறுப்பினர் வாரியாக செயல்திறன்",
+            "broker_comparison": "தரகர் வாரியாக ஒப்பீடு",
+            "top_performers": "சிறந்த செயல்திறன் பங்குகள்",
+            "language": "மொழி",
+            "sort_by": "வரிசைப்படுத்து",
+            "stock_code": "பங்கு குறியீடு",
+            "summarize_by": "சுருக்கம்",
+            "default_file": "இயல்புநிலை கோப்பு"
+        }
+    }
+    return translations
+
+def format_currency(value):
+    """Format value as Indian Rupee with proper alignment"""
+    if pd.isna(value):
+        return "₹0.00"
+    return f"₹{value:,.2f}"
+
+def format_percentage(value):
+    """Format percentage with 2 decimal places"""
+    if pd.isna(value):
+        return "0.00%"
+    return f"{value:.2f}%"
+
+def calculate_hpr(current_value, cost_value):
+    """Calculate Holding Period Return percentage"""
+    if cost_value == 0:
+        return 0
+    return ((current_value - cost_value) / cost_value) * 100
+
+def clean_portfolio_data(df):
+    """Convert numeric columns, treating unparseable values as 0, and encode dimension columns"""
+    for col in ['Value At Cost', 'Value At Market Price', 'Qty']:
+        if col in df.columns:
+            df[col] = columnar_store.to_number(df[col], col)
+    # Filters, groupbys and sorts then run on integer codes
+    dimension_codes.encode_dimensions(df, columnar_store.CATEGORY_COLUMNS)
+    return df
+
+def load_portfolio_file(source):
+    """Parse and clean a CSV path or uploaded bytes once per content, returning (df, cache_key)"""
+    if isinstance(source, bytes):
+        cache_key = bytes_key(source)
+        read = lambda: pd.read_csv(io.BytesIO(source))
+    else:
+        cache_key = path_key(source)
+        read = lambda: columnar_store.load_holdings(source, columns=REQUIRED_COLUMNS)
+    df = parsed_file_cache.get_or_load(cache_key, lambda: clean_portfolio_data(read()))
+    return df, cache_key
+
+def load_clean_holdings(path):
+    """Typed and cleaned holdings from a file on disk, without caching"""
+    return clean_portfolio_data(columnar_store.load_holdings(path, columns=REQUIRED_COLUMNS))
+
+def _shared(path, load, derive=None):
+    """Process-wide dataset for path; with ORCHIDLAB_SHARED_STORE set, one published copy per host
+
+    load reads the source columns, which are what gets published. derive, if
+    given, adds date-dependent columns after loading or attaching; the dataset
+    is then also reloaded when the date changes so they never go stale.
+    """
+    root = os.environ.get(shared_store.ROOT_ENV)
+    if not root:
+        read, signature = load, path_key
+    else:
+        # Every worker maps the published arrays; a newer source file is published
+        # by the first worker to notice, and the others pick up the new version
+        read = lambda p: shared_store.attach(p, root)
+        signature = lambda p: shared_store.ensure_published(p, root, load)
+    if derive is None:
+        return shared_dataset(path, read, signature=signature)
+    return shared_dataset(
+        path, lambda p: derive(read(p)),
+        signature=lambda p: (signature(p), pd.Timestamp.today().date())
+    )
+
+def shared_holdings(path):
+    """Process-wide read-only holdings dataset for a file on disk, reloaded when the file changes"""
+    return _shared(path, load_clean_holdings)
+
+def load_portfolio_aggregates(source):
+    """Stream a CSV path or uploaded bytes into running aggregates once per content, returning (aggregates, cache_key)"""
+    if isinstance(source, bytes):
+        cache_key = bytes_key(source) + ':stream'
+        read = lambda: stream_aggregate(io.BytesIO(source), REQUIRED_COLUMNS)
+    else:
+        cache_key = path_key(source) + ':stream'
+        read = lambda: stream_aggregate(source, REQUIRED_COLUMNS)
+    aggregates = parsed_file_cache.get_or_load(cache_key, read)
+    return aggregates, cache_key
+
+def validate_columns(df, required_columns=REQUIRED_COLUMNS):
+    """Required columns missing from df"""
+    return [col for col in required_columns if col not in df.columns]
+
+def filter_holdings(df, selections, index=None, sort_by=None):
+    """Rows matching selections ({column: value or list}, 'All'/None for no filter), optionally sorted
+
+    Pass a prebuilt FilterIndex to reuse it across calls.
+    """
+    if index is None:
+        index = FilterIndex(df, list(selections))
+    positions = index.resolve(selections)
+    if sort_by:
+        positions = sort_positions(df, positions, sort_by)
+    return df.take(positions)
+
+def create_summary_table(cube, translations, lang, group_by='Member'):
+    """Create summary table by rolling up the aggregation cube based on grouping option"""
+    # Group by the selected option
+    group_col = group_by
+    group_col_display = translations[lang][group_by.lower()]
+    summary = aggregation_cube.rollup(cube, ['Portfolio', group_col])[
+        ['Portfolio', group_col, 'Value At Cost', 'Value At Market Price']
+    ]
+    
+    # Calculate HPR
+    summary['HPR'] = returns_engine.hpr(summary['Value At Market Price'], summary['Value At Cost'])
+    
+    # Rename columns for display
+    summary_display = summary.copy()
+    summary_display = summary_display.rename(columns={
+        group_col: group_col_display,
+        'Value At Cost': translations[lang]['investment'],
+        'Value At Market Price': translations[lang]['current_value'],
+        'HPR': translations[lang]['hpr']
+    })
+    
+    # Remove Portfolio column if it's not needed for display
+    if 'Portfolio' in summary_display.columns:
+        summary_display = summary_display.drop('Portfolio', axis=1)
+    
+    return summary, summary_display
+
+def create_detail_table(df, translations, lang):
+    """Create detailed table with all records"""
+    detail = df.copy()
+    detail['HPR'] = returns_engine.hpr(detail['Value At Market Price'], detail['Value At Cost'])
+    
+    # Rename columns for display
+    detail_display = detail.copy()
+    detail_display.columns = [
+        translations[lang]['member'] if col == 'Member' else
+        translations[lang]['broker'] if col == 'Broker' else
+        translations[lang]['sector'] if col == 'Sector' else
+        translations[lang]['stock_code'] if col == 'Company Name' else
+        translations[lang]['quantity'] if col == 'Qty' else
+        translations[lang]['invested_amount'] if col == 'Value At Cost' else
+        translations[lang]['current_value'] if col == 'Value At Market Price' else
+        translations[lang]['hpr'] if col == 'HPR' else col
+        for col in detail_display.columns
+    ]
+    
+    return detail, detail_display
+
+def top_performers(df, n=10):
+    """Top n lots by HPR"""
+    stock_performance = df.copy()
+    stock_performance['HPR'] = returns_engine.hpr(stock_performance['Value At Market Price'], stock_performance['Value At Cost'])
+    return stock_performance.nlargest(n, 'HPR')
+
+def portfolio_metrics(cube):
+    """Total investment, current value, gain/loss and HPR of a (sliced) aggregation cube"""
+    totals = aggregation_cube.totals(cube)
+    investment = totals['Value At Cost']
+    current_value = totals['Value At Market Price']
+    return {
+        'investment': investment,
+        'current_value': current_value,
+        'gain_loss': current_value - investment,
+        'hpr': calculate_hpr(current_value, investment)
+    }
+
+# portfolio.csv (transaction) schema used by orchidDashboardStock.py
+TRANSACTION_COLUMNS = [
+    "broker name", "family member name", "stock code", "sector code", "portfolio metrics code",
+    "quantity", "invested amount", "current value", "transaction date"
+]
+TRANSACTION_FILTER_COLUMNS = ["family member name", "broker name", "sector code", "stock code"]
+
+def load_transaction_columns(path="portfolio.csv"):
+    """The transaction schema's source columns, typed"""
+    return columnar_store.load_holdings(path, columns=TRANSACTION_COLUMNS)
+
+def add_holding_period(df, as_of=None):
+    """Add holding period days as of a date (default today)"""
+    as_of = pd.Timestamp.today() if as_of is None else pd.Timestamp(as_of)
+    df["holding period days"] = (as_of - df["transaction date"]).dt.days
+    return df
+
+def load_transactions(path="portfolio.csv", as_of=None):
+    """Load the transaction schema and derive holding period days as of a date (default today)"""
+    return add_holding_period(load_transaction_columns(path), as_of)
+
+def shared_transactions(path="portfolio.csv"):
+    """Process-wide read-only transactions dataset, reloaded when the file or the date changes"""
+    return _shared(path, load_transaction_columns, derive=add_holding_period)
+
+def transaction_cash_flows(df, share=None):
+    """Dated cash flows of a transactions frame as (rows, amounts, years before the load date)
+
+    Buys pay their invested amount out on the transaction date and sales bring
+    their proceeds in on theirs. What is still held comes in at current value
+    on the load date; after sales that is the FIFO remainder of each lot.
+    rows gives the frame row each flow came from. Pass share, the
+    lot_matching.unsold_share of df, to reuse an earlier match.
+    """
+    sale = lot_matching.sale_mask(df)
+    share = lot_matching.unsold_share(df) if share is None else share
+    rows = np.arange(len(df))
+    amounts = np.abs(df["invested amount"].to_numpy(dtype="float64"))
+    years = df["holding period days"].to_numpy(dtype="float64") / 365
+    held = df["current value"].to_numpy(dtype="float64") * share
+    flow_rows = np.concatenate([rows, rows])
+    flow_amounts = np.concatenate([np.where(sale, amounts, -amounts), held])
+    flow_years = np.concatenate([years, np.zeros(len(df))])
+    return flow_rows, flow_amounts, flow_years
+
+def open_positions(df, share=None):
+    """Rows still held, in frame order: sales dropped, lots scaled to their unsold quantity, invested amount and current value"""
+    share = lot_matching.unsold_share(df) if share is None else share
+    held = share > 0
+    positions = df[held].copy()
+    share = share[held]
+    quantity = pd.Series(np.round(positions["quantity"].to_numpy(dtype="float64") * share, 4), index=positions.index)
+    positions["quantity"] = columnar_store.to_number(quantity, "quantity")
+    positions["invested amount"] = positions["invested amount"].to_numpy(dtype="float64") * share
+    positions["current value"] = positions["current value"].to_numpy(dtype="float64") * share
+    return positions
+
+def transaction_xirr(df, group_field, share=None):
+    """XIRR (%) per group_field value, in groupby order, and for the whole frame"""
+    rows, amounts, years = transaction_cash_flows(df, share)
+    group = df.groupby(group_field, observed=True, dropna=False).ngroup().to_numpy()[rows]
+    per_group = returns_engine.xirr(group, amounts, years) * 100
+    total = returns_engine.xirr(np.zeros(len(rows), dtype="int64"), amounts, years, n_groups=1)[0] * 100
+    return per_group, total
+
+def summarize_transactions(df, group_field, share=None):
+    """Invested amount, current value, return (%) and XIRR (%) per group_field, and the same with a Total row appended
+
+    Invested amount and current value are those of the open positions (see
+    open_positions); XIRR also counts the cash flows of what was sold.
+    """
+    share = lot_matching.unsold_share(df) if share is None else share
+    positions = open_positions(df, share)
+    # Rows with a blank group_field form their own group, last
+    group_summary = positions.groupby(group_field, observed=True, dropna=False).agg({
+        "invested amount": "sum",
+        "current value": "sum"
+    })
+    group_xirr, total_xirr = transaction_xirr(df, group_field, share)
+    # Groups whose every lot was sold have no open position left
+    group_summary = group_summary.reindex(
+        df.groupby(group_field, observed=True, dropna=False).size().index, fill_value=0.0
+    ).reset_index()
+    group_summary["return (%)"] = returns_engine.hpr(group_summary["current value"], group_summary["invested amount"])
+    group_summary["xirr (%)"] = group_xirr
+
+    invested, current = positions["invested amount"].sum(), positions["current value"].sum()
+    total_row = {group_field: "Total",
+                 "invested amount": invested,
+                 "current value": current,
+                 "return (%)": returns_engine.hpr(current, invested),
+                 "xirr (%)": total_xirr}
+    summary = pd.concat([group_summary, pd.DataFrame([total_row])], ignore_index=True)
+    return group_summary, summary
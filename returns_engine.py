@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+# Columnar return engine: every function works on whole Series/arrays at once
+# so callers never need DataFrame.apply(..., axis=1) over rows.
+
+
+def _as_float_array(values):
+    """Return values as a float64 NumPy array"""
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype='float64', na_value=np.nan)
+    return np.asarray(values, dtype='float64')
+
+
+def _wrap(result, like):
+    """Give the result the same index as the input when it was a Series, or a float for scalars"""
+    if isinstance(like, pd.Series):
+        return pd.Series(result, index=like.index)
+    if np.ndim(result) == 0:
+        return float(result)
+    return result
+
+
+def hpr(current_value, cost_value):
+    """Vectorized Holding Period Return percentage, 0 where the cost is zero"""
+    current = _as_float_array(current_value)
+    cost = _as_float_array(cost_value)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(cost == 0, 0.0, (current - cost) / cost * 100)
+    return _wrap(result, cost_value)
+
+
+def absolute_gain(current_value, cost_value):
+    """Vectorized absolute gain/loss (current value minus cost)"""
+    result = _as_float_array(current_value) - _as_float_array(cost_value)
+    return _wrap(result, cost_value)
+
+
+def gain_share(current_value, cost_value):
+    """Share (%) of the total gain contributed by each row, 0 when the total gain is zero"""
+    gain = _as_float_array(current_value) - _as_float_array(cost_value)
+    total = np.nansum(gain)
+    if total == 0:
+        return _wrap(np.zeros_like(gain), cost_value)
+    return _wrap(gain / total * 100, cost_value)
+
+
+def weight(value):
+    """Weight (%) of each row in the total value, 0 when the total is zero"""
+    values = _as_float_array(value)
+    total = np.nansum(values)
+    if total == 0:
+        return _wrap(np.zeros_like(values), value)
+    return _wrap(values / total * 100, value)
+
+
+def _npv(rate, group, amounts, years, n_groups):
+    """Per-group value at the valuation date of cash flows compounded at rate, and its derivative"""
+    base = 1 + rate[group]
+    growth = base ** years
+    npv = np.bincount(group, weights=amounts * growth, minlength=n_groups)
+    slope = np.bincount(group, weights=amounts * years * growth / base, minlength=n_groups)
+    return npv, slope
+
+
+# Range of annual rates xirr reports; roots outside it come back as NaN
+XIRR_MIN_RATE = -0.999999
+XIRR_MAX_RATE = 1e4
+
+
+def xirr(group, amounts, years, n_groups=None, tol=1e-9, newton_steps=50, bisection_steps=200):
+    """Annualized internal rate of return of every group's dated cash flows at once
+
+    Flow i belongs to group[i], is amounts[i] (negative paid in, positive paid
+    out or still held) and happened years[i] before the valuation date. All
+    groups take Newton steps together as whole-array operations; groups where
+    Newton leaves the domain or fails to converge are finished by bisection
+    on [-0.999999, 1e4], again all at once. Groups without both signs of flow,
+    or whose rate lies outside that range (a loss of a few days annualizes
+    below -99.9999%), get NaN.
+    """
+    group = np.asarray(group, dtype='int64')
+    amounts = _as_float_array(amounts)
+    years = _as_float_array(years)
+    if n_groups is None:
+        n_groups = group.max() + 1 if len(group) else 0
+    scale = np.bincount(group, weights=np.abs(amounts), minlength=n_groups)
+    has_in = np.bincount(group, weights=amounts > 0, minlength=n_groups) > 0
+    has_out = np.bincount(group, weights=amounts < 0, minlength=n_groups) > 0
+    solvable = has_in & has_out
+
+    rate = np.full(n_groups, 0.1)
+    done = ~solvable
+    with np.errstate(all='ignore'):
+        for _ in range(newton_steps):
+            npv, slope = _npv(rate, group, amounts, years, n_groups)
+            step = np.where(done, 0.0, npv / slope)
+            rate = rate - step
+            # Out of the domain: leave it to bisection
+            failed = ~done & (~np.isfinite(rate) | (rate <= -1))
+            rate[failed] = np.nan
+            done |= failed | (np.abs(step) < tol)
+            if done.all():
+                break
+        npv, _ = _npv(rate, group, amounts, years, n_groups)
+        converged = (
+            solvable & (rate >= XIRR_MIN_RATE) & (rate <= XIRR_MAX_RATE)
+            & (np.abs(npv) <= tol * np.maximum(scale, 1))
+        )
+
+        # Bisection for the stragglers, on a subset of the flows
+        pending = solvable & ~converged
+        if pending.any():
+            keep = pending[group]
+            sub_group = np.cumsum(pending)[group[keep]] - 1
+            count = int(pending.sum())
+            lo = np.full(count, XIRR_MIN_RATE)
+            hi = np.full(count, XIRR_MAX_RATE)
+            f_lo, _ = _npv(lo, sub_group, amounts[keep], years[keep], count)
+            for _ in range(bisection_steps):
+                mid = (lo + hi) / 2
+                f_mid, _ = _npv(mid, sub_group, amounts[keep], years[keep], count)
+                left = np.sign(f_mid) == np.sign(f_lo)
+                lo = np.where(left, mid, lo)
+                f_lo = np.where(left, f_mid, f_lo)
+                hi = np.where(left, hi, mid)
+                if np.all(hi - lo < tol):
+                    break
+            f_hi, _ = _npv(hi, sub_group, amounts[keep], years[keep], count)
+            bracketed = np.sign(f_lo) != np.sign(f_hi)
+            rate[pending] = np.where(bracketed, (lo + hi) / 2, np.nan)
+    rate[~solvable] = np.nan
+    return rate
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+import dimension_codes
+
+# Value-weighted per-holding metrics (beta in 'portfolio metrics code', and any
+# other metric columns) at every aggregation level. The weight and weight ×
+# metric products are formed once for the whole book; each level is then one
+# np.bincount per product over the level's integer category codes, with no
+# hashing of labels and no intermediate frames.
+#
+# The sums are kept per level, so changing one holding's weight or metrics
+# adjusts one group per level instead of regrouping the book.
+
+METRIC_COLUMNS = ["portfolio metrics code"]
+WEIGHT_COLUMN = "current value"
+
+
+class WeightedMetrics:
+    """Value-weighted metric averages per group at several aggregation levels, with single-holding updates"""
+
+    def __init__(self, df, levels, metrics=METRIC_COLUMNS, weight=WEIGHT_COLUMN):
+        self.levels = list(levels)
+        self.metrics = [col for col in metrics if col in df.columns]
+        self.weight = weight
+        # Private copies: the frame itself may be shared and read-only
+        self.weights = df[weight].to_numpy(dtype="float64").copy()
+        self.values = df[self.metrics].to_numpy(dtype="float64").copy()
+
+        products = np.column_stack([self.weights, self.weights[:, None] * self.values])
+        self._row_group = {}
+        self._labels = {}
+        self._level_sums = {}
+        for level in self.levels:
+            series = df[level]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, labels = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, labels = pd.factorize(series, sort=True)
+            # Blank values (code -1) get a group of their own, after the others
+            blank = codes < 0
+            if blank.any():
+                codes = np.where(blank, len(labels), codes)
+                labels = pd.Index(labels, dtype=object).append(pd.Index([dimension_codes.BLANK_LABEL]))
+            sums = np.column_stack([
+                np.bincount(codes, weights=products[:, i], minlength=len(labels)) for i in range(products.shape[1])
+            ])
+            # Only groups with rows in this frame
+            present = np.bincount(codes, minlength=len(labels)) > 0
+            self._row_group[level] = np.cumsum(present)[codes] - 1
+            self._labels[level] = labels[present]
+            self._level_sums[level] = sums[present]
+        self._total = products.sum(axis=0)
+
+    @staticmethod
+    def _averages(sums):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(sums[:, :1] != 0, sums[:, 1:] / sums[:, :1], np.nan)
+
+    def weighted(self, level):
+        """Frame of total weight and weighted metrics per group of level"""
+        sums = self._level_sums[level]
+        result = pd.DataFrame(self._averages(sums), columns=[f"weighted {col}" for col in self.metrics])
+        result.insert(0, self.weight, sums[:, 0])
+        result.insert(0, level, self._labels[level])
+        return result
+
+    def total(self):
+        """Weighted metrics over the whole frame, as a Series"""
+        averages = self._averages(self._total[None, :])[0]
+        return pd.Series(averages, index=[f"weighted {col}" for col in self.metrics])
+
+    def update(self, position, weight=None, **metrics):
+        """Change the holding at row position: its weight and/or metrics given by column name
+
+        Only that holding's group at each level is adjusted.
+        """
+        old = np.r_[self.weights[position], self.weights[position] * self.values[position]]
+        if weight is not None:
+            self.weights[position] = weight
+        for col, value in metrics.items():
+            self.values[position, self.metrics.index(col)] = value
+        delta = np.r_[self.weights[position], self.weights[position] * self.values[position]] - old
+        for level in self.levels:
+            self._level_sums[level][self._row_group[level][position]] += delta
+        self._total += delta
@@ -0,0 +1,40 @@
+import streamlit as st
+
+# Section-level memoization across Streamlit reruns. Each dashboard section
+# declares the inputs it depends on; on a rerun a section whose inputs are
+# unchanged returns its stored result instead of recomputing, so e.g. changing
+# the detail sort does not rebuild the summary or the charts. Every run logs
+# which sections were recomputed, for the debug overlay.
+
+
+def begin_run():
+    """Start a fresh recompute log for this script run"""
+    st.session_state['section_log'] = {}
+
+
+def cached(name, inputs, compute):
+    """Result of compute() for section name, recomputed only when inputs (a hashable tuple) change"""
+    store = st.session_state.setdefault('section_store', {})
+    log = st.session_state.setdefault('section_log', {})
+    entry = store.get(name)
+    if entry is not None and entry[0] == inputs:
+        log[name] = 'cached'
+        return entry[1]
+    value = compute()
+    store[name] = (inputs, value)
+    log[name] = 'recomputed'
+    return value
+
+
+def mark(name, status='recomputed'):
+    """Log a section that manages its own state (e.g. a fragment)"""
+    st.session_state.setdefault('section_log', {})[name] = status
+
+
+def render_overlay():
+    """Sidebar panel listing which sections were recomputed on the last run"""
+    log = st.session_state.get('section_log', {})
+    with st.sidebar.expander("Recomputed sections", expanded=True):
+        for name, status in log.items():
+            icon = '🔄' if status == 'recomputed' else '✅'
+            st.markdown(f"{icon} `{name}` — {status}")
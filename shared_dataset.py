@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+
+from parsed_file_cache import estimate_size, path_key
+
+# One loaded dataset per source file per server process. Streamlit runs every
+# browser session as a thread of the same process, so a frame held at module
+# level is visible to all of them: the file is loaded, cleaned and indexed
+# once, and each session only pays for what it derives from it.
+#
+# The shared frame is read-only by contract. Sessions never modify it in
+# place; filtering goes through take()/sort_values(), which copy, so every
+# session's filtered rows are its own (copy-on-filter) while the base frame
+# and its indexes are never duplicated.
+
+
+class SharedDataset:
+    """A loaded file and the structures built from it, shared read-only across sessions"""
+
+    def __init__(self, path, load, signature=path_key, session_ttl=3600):
+        self.path = os.path.abspath(path)
+        self.load = load
+        self.signature = signature
+        self.session_ttl = session_ttl
+        self.version = 0
+        self.loads = 0
+        self._signature = None
+        self._frame = None
+        self._resources = {}
+        self._sessions = {}
+        self._lock = threading.RLock()
+
+    @property
+    def cache_key(self):
+        return f"shared:{self.path}:{self.version}"
+
+    def snapshot(self):
+        """(frame, cache_key) for the current version, reloading first if the file changed on disk"""
+        signature = self.signature(self.path)
+        with self._lock:
+            # Sessions arriving during a reload wait here instead of loading a second copy
+            if signature != self._signature:
+                self._reload(signature)
+            return self._frame, self.cache_key
+
+    def reload(self):
+        """Force a reload from disk, e.g. after replacing the file with identical mtime and size"""
+        with self._lock:
+            self._reload(self.signature(self.path))
+
+    def _reload(self, signature):
+        frame = self.load(self.path)
+        # Derived structures belong to the old version; drop them with it
+        self._frame = frame
+        self._resources = {}
+        self._signature = signature
+        self.version += 1
+        self.loads += 1
+
+    def resource(self, name, build):
+        """Structure derived from the current frame (index, cube, ...), built once per version"""
+        with self._lock:
+            frame, _ = self.snapshot()
+            if name not in self._resources:
+                self._resources[name] = build(frame)
+            return self._resources[name]
+
+    def attach(self, session_id, state):
+        """Record a session using this dataset and the bytes its state holds beyond the shared objects"""
+        with self._lock:
+            seen = {id(self._frame)} | {id(value) for value in self._resources.values()}
+            self._sessions[session_id] = (estimate_size(state, seen), time.monotonic())
+
+    def _active_sessions(self):
+        cutoff = time.monotonic() - self.session_ttl
+        return {sid: size for sid, (size, seen) in self._sessions.items() if seen >= cutoff}
+
+    def stats(self):
+        """Shared bytes held once, and per-session bytes for sessions seen within session_ttl"""
+        with self._lock:
+            seen = set()
+            dataset_bytes = estimate_size(self._frame, seen) if self._frame is not None else 0
+            resource_bytes = estimate_size(self._resources, seen)
+            rows = 0 if self._frame is None else len(self._frame)
+            sessions = self._active_sessions()
+        session_bytes = sum(sessions.values())
+        return {
+            'version': self.version,
+            'loads': self.loads,
+            'rows': rows,
+            'dataset_bytes': dataset_bytes,
+            'resource_bytes': resource_bytes,
+            'sessions': len(sessions),
+            'session_bytes_total': session_bytes,
+            'session_bytes_mean': session_bytes / len(sessions) if sessions else 0
+        }
+
+
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+
+def shared_dataset(path, load, signature=path_key):
+    """The process-wide SharedDataset for path, created on first use
+
+    signature(path) decides when to reload; it defaults to the file's mtime and size.
+    """
+    key = os.path.abspath(path)
+    with _datasets_lock:
+        if key not in _datasets:
+            _datasets[key] = SharedDataset(path, load, signature)
+        return _datasets[key]
@@ -0,0 +1,60 @@
+"""Cleaned holdings published once into shared memory for every dashboard worker.
+
+When several Streamlit server processes run behind a load balancer, each one
+used to parse and clean the holdings file itself. In shared-store mode the
+first worker to see a new file publishes the cleaned frame as a binary store
+(see binary_store) under a RAM-backed directory (/dev/shm on Linux). Every
+worker then maps the column arrays read-only, so all processes share the same
+physical pages and nothing is copied. A new publish swaps the store's CURRENT
+pointer atomically and workers pick it up on their next rerun.
+
+Enable it for the dashboards by setting ORCHIDLAB_SHARED_STORE to the root
+directory, or publish ahead of time:
+
+    python shared_store.py portfolio-inputs.csv [--root /dev/shm/orchidlab]
+"""
+import argparse
+import os
+
+import binary_store
+
+ROOT_ENV = 'ORCHIDLAB_SHARED_STORE'
+DEFAULT_ROOT = '/dev/shm/orchidlab'
+
+
+def store_dir(root, source):
+    """Directory holding the published versions of a source file"""
+    return os.path.join(root, os.path.splitext(os.path.basename(source))[0])
+
+
+def ensure_published(source, root, load):
+    """Version currently published for source, publishing load(source) first if it is missing or stale"""
+    directory = store_dir(root, source)
+    if not binary_store.is_current(directory, source):
+        with binary_store.publish_lock(directory):
+            # Another worker may have published while we waited for the lock
+            if not binary_store.is_current(directory, source):
+                binary_store.publish(load(source), source, directory)
+    return binary_store.current_version(directory)
+
+
+def attach(source, root, columns=None):
+    """Read-only frame over the currently published version of source"""
+    return binary_store.open_store(store_dir(root, source), columns)
+
+
+if __name__ == "__main__":
+    from portfolio_core import load_clean_holdings, load_transaction_columns
+
+    parser = argparse.ArgumentParser(description="Publish cleaned holdings into the shared store")
+    parser.add_argument('sources', nargs='+', help="Holdings CSV files")
+    parser.add_argument('--root', default=os.environ.get(ROOT_ENV, DEFAULT_ROOT), help="Shared store directory")
+    parser.add_argument('--schema', choices=['holdings', 'transactions'], default='holdings',
+                        help="portfolio-inputs.csv style holdings or portfolio.csv style transactions")
+    args = parser.parse_args()
+    load = load_clean_holdings if args.schema == 'holdings' else load_transaction_columns
+    for path in args.sources:
+        directory = store_dir(args.root, path)
+        with binary_store.publish_lock(directory):
+            version = binary_store.publish(load(path), path, directory)
+        print(f"{path} -> {os.path.join(directory, version)}")
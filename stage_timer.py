@@ -0,0 +1,133 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Lightweight per-stage instrumentation for dashboard reruns. Each stage
+# records wall time, rows in/out and the change in process resident memory;
+# the timings of recent reruns are kept in session state, shown in an
+# optional sidebar panel and exportable as JSON lines.
+
+MAX_RUNS = 50
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def rss_bytes():
+    """Current resident set size of this process, or 0 where it cannot be read cheaply"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS, but still shows growth between stages
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+    except (ImportError, AttributeError):
+        return 0
+
+
+class StageRecord:
+    """Timing of one stage; set rows_out inside the with-block"""
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = 0.0
+        self.memory_delta = 0
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'ms': round(self.seconds * 1000, 3),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'memory_delta_bytes': self.memory_delta
+        }
+
+
+class RunTimings:
+    """Stage records of a single script run"""
+
+    def __init__(self, script):
+        self.script = script
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = StageRecord(name, rows_in)
+        memory_before = rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            record.memory_delta = rss_bytes() - memory_before
+            self.stages.append(record)
+
+    def records(self):
+        """Stage dicts tagged with the script and run start time"""
+        return [dict(script=self.script, run=self.started, **record.as_dict()) for record in self.stages]
+
+
+def begin_run(script):
+    """Start timing a rerun; older runs are kept for export, up to MAX_RUNS"""
+    timings = RunTimings(script)
+    history = st.session_state.setdefault('stage_timings', [])
+    history.append(timings)
+    del history[:-MAX_RUNS]
+    return timings
+
+
+def to_jsonl(history):
+    """All stage records of the given runs as JSON lines"""
+    return ''.join(json.dumps(record) + '\n' for run in history for record in run.records())
+
+
+def render_panel(timings):
+    """Sidebar panel with this run's stage timings and a JSON lines export of recent runs"""
+    with st.sidebar.expander("Stage timings", expanded=True):
+        records = [record.as_dict() for record in timings.stages]
+        st.dataframe(records, hide_index=True)
+        st.caption(f"Total {sum(record.seconds for record in timings.stages) * 1000:,.1f} ms")
+        st.download_button(
+            "Export timings (JSON lines)",
+            data=to_jsonl(st.session_state.get('stage_timings', [])),
+            file_name="stage-timings.jsonl",
+            mime="application/jsonl"
+        )
+
+
+def track_session(dataset):
+    """Record this session's private memory against a shared dataset"""
+    ctx = get_script_run_ctx()
+    dataset.attach(ctx.session_id if ctx is not None else 'local', st.session_state.to_dict())
+
+
+def render_memory_panel(dataset):
+    """Sidebar panel splitting memory into what is held once per process and what each session adds"""
+    stats = dataset.stats()
+    mb = 1024 * 1024
+    with st.sidebar.expander("Memory", expanded=True):
+        st.dataframe([
+            {'held': 'dataset (shared)', 'MB': stats['dataset_bytes'] / mb},
+            {'held': 'indexes (shared)', 'MB': stats['resource_bytes'] / mb},
+            {'held': 'per session (mean)', 'MB': stats['session_bytes_mean'] / mb},
+            {'held': 'all sessions', 'MB': stats['session_bytes_total'] / mb},
+            {'held': 'process RSS', 'MB': rss_bytes() / mb}
+        ], hide_index=True)
+        st.caption(
+            f"{stats['rows']:,} rows, version {stats['version']} ({stats['loads']} loads), "
+            f"{stats['sessions']} active sessions"
+        )
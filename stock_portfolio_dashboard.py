@@ -1,180 +1,150 @@
+import os
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import json
-import io
-
-# Multi-language support
-def load_translations():
-    translations = {
-        "en": {
-            "title": "Stock Portfolio Dashboard",
-            "upload_file": "Upload CSV File",
-            "portfolio_filter": "Portfolio Filter",
-            "member_filter": "Member Filter",
-            "broker_filter": "Broker Filter",
-            "sector_filter": "Sector Filter",
-            "summary_table": "Portfolio Summary",
-            "detail_table": "Portfolio Details",
-            "charts": "Portfolio Analysis Charts",
-            "member": "Member",
-            "broker": "Broker",
-            "company_name": "Company Name",
-            "sector": "Sector",
-            "investment": "Investment",
-            "current_value": "Current Value",
-            "hpr": "HPR (%)",
-            "quantity": "Quantity",
-            "invested_amount": "Invested Amount",
-            "holding_period": "Holding Period",
-            "portfolio_distribution": "Portfolio Distribution by Sector",
-            "member_performance": "Member-wise Performance",
-            "broker_comparison": "Broker-wise Comparison",
-            "top_performers": "Top Performing Stocks",
-            "language": "Language",
-            "sort_by": "Sort By",
-            "stock_code": "Stock Code",
-            "summarize_by": "Summarize By",
-            "default_file": "Default File"
-        },
-        "ta": {
-            "title": "பங்கு போர்ட்ஃபோலியோ டாஷ்போர்டு",
-            "upload_file": "CSV கோப்பை பதிவேற்றுக",
-            "portfolio_filter": "போர்ட்ஃபோலியோ வடிகட்டி",
-            "member_filter": "உறுப்பினர் வடிகட்டி",
-            "broker_filter": "தரகர் வடிகட்டி",
-            "sector_filter": "துறை வடிகட்டி",
-            "summary_table": "போர்ட்ஃபோலியோ சுருக்கம்",
-            "detail_table": "போர்ட்ஃபோலியோ விவரங்கள்",
-            "charts": "போர்ட்ஃபோலியோ பகுப்பாய்வு விளக்கப்படங்கள்",
-            "member": "உறுப்பினர்",
-            "broker": "தரகர்",
-            "company_name": "நிறுவன பெயர்",
-            "sector": "துறை",
-            "investment": "முதலீடு",
-            "current_value": "தற்போதைய மதிப்பு",
-            "hpr": "HPR (%)",
-            "quantity": "அளவு",
-            "invested_amount": "முதலீட்டு தொகை",
-            "holding_period": "வைத்திருக்கும் காலம்",
-            "portfolio_distribution": "துறை வாரியாக போர்ட்ஃபோலியோ விநியோகம்",
-            "member_performance": "உறுப்பினர் வாரியாக செயல்திறன்",
-            "broker_comparison": "தரகர் வாரியாக ஒப்பீடு",
-            "top_performers": "சிறந்த செயல்திறன் பங்குகள்",
-            "language": "மொழி",
-            "sort_by": "வரிசைப்படுத்து",
-            "stock_code": "பங்கு குறியீடு",
-            "summarize_by": "சுருக்கம்",
-            "default_file": "இயல்புநிலை கோப்பு"
-        }
-    }
-    return translations
-
-def format_currency(value):
-    """Format value as Indian Rupee with proper alignment"""
-    if pd.isna(value):
-        return "₹0.00"
-    return f"₹{value:,.2f}"
-
-def format_percentage(value):
-    """Format percentage with 2 decimal places"""
-    if pd.isna(value):
-        return "0.00%"
-    return f"{value:.2f}%"
+import returns_engine
+import aggregation_cube
+import dimension_codes
+import pdf_report
+import table_rendering
+import sections
+import stage_timer
+import var_engine
+from paged_table import PagedView
+from figure_cache import cached_figure
+from filter_index import FilterIndex
+from parsed_file_cache import parsed_file_cache, path_key
+from portfolio_core import (
+    load_translations, format_currency, format_percentage,
+    load_portfolio_file, load_portfolio_aggregates, shared_holdings, validate_columns, filter_holdings,
+    create_summary_table, create_detail_table, top_performers, portfolio_metrics
+)
 
-def calculate_hpr(current_value, cost_value):
-    """Calculate Holding Period Return percentage"""
-    if cost_value == 0:
-        return 0
-    return ((current_value - cost_value) / cost_value) * 100
+# Optional local returns/covariance file enabling the Value at Risk section
+VAR_COVARIANCE_FILE = 'returns-covariance.csv'
+VAR_SCENARIOS = 100_000
+VAR_WORKERS = os.cpu_count()
 
-def style_negative_returns(val):
-    """Apply conditional formatting for negative returns"""
-    if isinstance(val, str) and '%' in val:
-        try:
-            num_val = float(val.replace('%', ''))
-            if num_val < 0:
-                return 'background-color: #ffebee; color: #c62828'
-            elif num_val > 0:
-                return 'background-color: #e8f5e8; color: #2e7d32'
-        except:
-            pass
-    return ''
-
-def create_summary_table(df, translations, lang, group_by='Member'):
-    """Create summary table with aggregated data based on grouping option"""
-    # Group by the selected option
-    if group_by == 'Member':
-        summary = df.groupby(['Portfolio', 'Member']).agg({
-            'Value At Cost': 'sum',
-            'Value At Market Price': 'sum'
-        }).reset_index()
-        group_col = 'Member'
-        group_col_display = translations[lang]['member']
-    elif group_by == 'Sector':
-        summary = df.groupby(['Portfolio', 'Sector']).agg({
-            'Value At Cost': 'sum',
-            'Value At Market Price': 'sum'
-        }).reset_index()
-        group_col = 'Sector'
-        group_col_display = translations[lang]['sector']
-    elif group_by == 'Broker':
-        summary = df.groupby(['Portfolio', 'Broker']).agg({
-            'Value At Cost': 'sum',
-            'Value At Market Price': 'sum'
-        }).reset_index()
-        group_col = 'Broker'
-        group_col_display = translations[lang]['broker']
+def build_charts(cube, top_stocks, translations, lang):
+    """Sector pie, member HPR bar, broker comparison and top performers figures, via the figure cache"""
+    # Imported on first use: charts are below the fold, so plotly.express
+    # stays off the path to the first rendered table
+    import plotly.express as px
     
-    # Calculate HPR
-    summary['HPR'] = summary.apply(
-        lambda row: calculate_hpr(row['Value At Market Price'], row['Value At Cost']), 
-        axis=1
-    )
+    # Sector-wise distribution pie chart
+    def sector_pie(sector_summary):
+        fig_pie = px.pie(
+            sector_summary, 
+            values='Value At Market Price', 
+            names='Sector',
+            title=translations[lang]['portfolio_distribution']
+        )
+        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+        return fig_pie
     
-    # Rename columns for display
-    summary_display = summary.copy()
-    summary_display = summary_display.rename(columns={
-        group_col: group_col_display,
-        'Value At Cost': translations[lang]['investment'],
-        'Value At Market Price': translations[lang]['current_value'],
-        'HPR': translations[lang]['hpr']
-    })
+    # Member-wise performance bar chart
+    def member_bar(member_summary):
+        fig_bar = px.bar(
+            member_summary, 
+            x='Member', 
+            y='HPR',
+            title=translations[lang]['member_performance'],
+            color='HPR',
+            color_continuous_scale=['red', 'yellow', 'green']
+        )
+        fig_bar.update_layout(yaxis_title="HPR (%)")
+        return fig_bar
     
-    # Remove Portfolio column if it's not needed for display
-    if 'Portfolio' in summary_display.columns:
-        summary_display = summary_display.drop('Portfolio', axis=1)
+    # Broker comparison
+    def broker_bar(broker_summary):
+        return px.bar(
+            broker_summary, 
+            x='Broker', 
+            y=['Value At Cost', 'Value At Market Price'],
+            title=translations[lang]['broker_comparison'],
+            barmode='group'
+        )
     
-    return summary, summary_display
-
-def create_detail_table(df, translations, lang):
-    """Create detailed table with all records"""
-    detail = df.copy()
-    detail['HPR'] = detail.apply(
-        lambda row: calculate_hpr(row['Value At Market Price'], row['Value At Cost']), 
-        axis=1
-    )
+    # Top performing stocks
+    def top_bar(top_stocks):
+        fig_top = px.bar(
+            top_stocks, 
+            x='HPR', 
+            y='Company Name',
+            title=translations[lang]['top_performers'],
+            orientation='h',
+            color='HPR',
+            color_continuous_scale=['red', 'yellow', 'green']
+        )
+        fig_top.update_layout(yaxis={'categoryorder': 'total ascending'})
+        return fig_top
     
-    # Rename columns for display
-    detail_display = detail.copy()
-    detail_display.columns = [
-        translations[lang]['member'] if col == 'Member' else
-        translations[lang]['broker'] if col == 'Broker' else
-        translations[lang]['sector'] if col == 'Sector' else
-        translations[lang]['stock_code'] if col == 'Company Name' else
-        translations[lang]['quantity'] if col == 'Qty' else
-        translations[lang]['invested_amount'] if col == 'Value At Cost' else
-        translations[lang]['current_value'] if col == 'Value At Market Price' else
-        translations[lang]['hpr'] if col == 'HPR' else col
-        for col in detail_display.columns
+    sector_summary = aggregation_cube.rollup(cube, ['Sector'])[['Sector', 'Value At Market Price']]
+    member_summary = aggregation_cube.rollup(cube, ['Member'])[['Member', 'Value At Cost', 'Value At Market Price']]
+    member_summary['HPR'] = returns_engine.hpr(member_summary['Value At Market Price'], member_summary['Value At Cost'])
+    broker_summary = aggregation_cube.rollup(cube, ['Broker'])[['Broker', 'Value At Cost', 'Value At Market Price']]
+    
+    return [
+        cached_figure('sector_pie', sector_summary, lang, sector_pie),
+        cached_figure('member_bar', member_summary, lang, member_bar),
+        cached_figure('broker_bar', broker_summary, lang, broker_bar),
+        cached_figure('top_bar', top_stocks[['Company Name', 'HPR']], lang, top_bar)
     ]
+
+@st.fragment
+def render_detail_section(filtered_df, view_key, translations, lang):
+    """Paged detail table; its sort and paging widgets rerun only this fragment"""
+    sections.mark('detail')
     
-    return detail, detail_display
+    # The paged view keeps the sort order as row positions between reruns
+    # and only slices the visible page out of filtered_df
+    if st.session_state.get('detail_view_key') != view_key:
+        st.session_state.detail_view = PagedView(filtered_df)
+        st.session_state.detail_view_key = view_key
+    view = st.session_state.detail_view
+    
+    detail_sort_options = {'-': None}
+    detail_sort_options.update({
+        translations[lang][key]: col for key, col in [
+            ('member', 'Member'), ('broker', 'Broker'), ('sector', 'Sector'),
+            ('stock_code', 'Company Name'), ('quantity', 'Qty'),
+            ('invested_amount', 'Value At Cost'), ('current_value', 'Value At Market Price'),
+            ('hpr', 'HPR')
+        ]
+    })
+    sort_col, order_col, size_col, page_col = st.columns([3, 2, 2, 2])
+    with sort_col:
+        detail_sort = st.selectbox(translations[lang]['sort_by'], list(detail_sort_options.keys()), key='detail_sort')
+    with order_col:
+        ascending = st.radio("Order", ["Ascending", "Descending"], horizontal=True, key='detail_order') == "Ascending"
+    with size_col:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 500], index=2, key='detail_page_size')
+    view.sort(detail_sort_options[detail_sort], ascending).set_page_size(page_size)
+    with page_col:
+        page_number = st.number_input("Page", min_value=1, max_value=view.n_pages, value=1, step=1, key='detail_page')
+    
+    _, detail_page = create_detail_table(view.page(page_number), translations, lang)
+    table_rendering.render_table(
+        detail_page,
+        currency_cols=[translations[lang]['invested_amount'], translations[lang]['current_value']],
+        percent_cols=[translations[lang]['hpr']],
+        return_cols=[translations[lang]['hpr']],
+        use_container_width=True,
+        hide_index=True
+    )
+    start, end = view.page_bounds(page_number)
+    st.caption(f"Rows {start + 1:,}–{end:,} of {len(view):,}")
+
+def file_resource(dataset, df, cache_key, name, build):
+    """Structure built from df once: held by the shared dataset for the default file, else by the parsed-file cache"""
+    if dataset is not None:
+        return dataset.resource(name, build)
+    return parsed_file_cache.get_or_load(cache_key + ':' + name, lambda: build(df))
 
 def main():
     st.set_page_config(page_title="Stock Portfolio Dashboard", layout="wide")
+    sections.begin_run()
+    timings = stage_timer.begin_run('stock_portfolio_dashboard')
     
     # Load translations
     translations = load_translations()
@@ -197,19 +167,37 @@ def main():
         value=True
     )
     
-    df = None
+    # Streaming mode keeps only running aggregates in memory
+    streaming = st.sidebar.checkbox(
+        "Streaming mode (large files)",
+        value=False,
+        help="Aggregate the file in chunks with bounded memory; the detail table is not shown"
+    )
+    load = load_portfolio_aggregates if streaming else load_portfolio_file
+    
+    loaded = None
+    cache_key = None
+    dataset = None
     
     if use_default:
         # Try to load default file
         try:
-            df = pd.read_csv('portfolio-inputs.csv')
+            with timings.stage('load/clean') as stage:
+                if streaming:
+                    loaded, cache_key = load('portfolio-inputs.csv')
+                else:
+                    # One read-only copy per server process, shared by every session
+                    shared = shared_holdings('portfolio-inputs.csv')
+                    loaded, cache_key = shared.snapshot()
+                    dataset = shared
+                stage.rows_out = len(loaded) if not streaming else loaded.rows
             st.sidebar.success("Default file loaded successfully!")
         except FileNotFoundError:
             st.sidebar.error("Default file 'portfolio-inputs.csv' not found. Please upload a file.")
         except Exception as e:
             st.sidebar.error(f"Error loading default file: {str(e)}")
     
-    if not use_default or df is None:
+    if not use_default or loaded is None:
         # File upload
         uploaded_file = st.sidebar.file_uploader(
             translations[lang]['upload_file'], 
@@ -219,26 +207,33 @@ def main():
         
         if uploaded_file is not None:
             try:
-                df = pd.read_csv(uploaded_file)
+                with timings.stage('load/clean') as stage:
+                    loaded, cache_key = load(uploaded_file.getvalue())
+                    stage.rows_out = len(loaded) if not streaming else loaded.rows
                 st.sidebar.success("File uploaded successfully!")
             except Exception as e:
                 st.sidebar.error(f"Error reading file: {str(e)}")
     
-    if df is not None:
+    if loaded is not None:
         try:
             
-            # Validate required columns
-            required_columns = ['Portfolio', 'Broker', 'Member', 'Company Name', 'Sector', 'Qty', 'Value At Cost', 'Value At Market Price']
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            df = None if streaming else loaded
+            aggregates = loaded if streaming else None
+            
+            # Validate required columns (streaming validates while reading)
+            missing_columns = [] if streaming else validate_columns(df)
             
             if missing_columns:
                 st.error(f"Missing columns: {', '.join(missing_columns)}")
                 return
             
-            # Clean and prepare data
-            df['Value At Cost'] = pd.to_numeric(df['Value At Cost'], errors='coerce').fillna(0)
-            df['Value At Market Price'] = pd.to_numeric(df['Value At Market Price'], errors='coerce').fillna(0)
-            df['Qty'] = pd.to_numeric(df['Qty'], errors='coerce').fillna(0)
+            # Aggregate once per file; summaries and charts roll up this cube
+            with timings.stage('aggregate cube', rows_in=0 if streaming else len(df)) as stage:
+                if streaming:
+                    cube = aggregates.cube
+                else:
+                    cube = file_resource(dataset, df, cache_key, 'cube', aggregation_cube.build_cube)
+                stage.rows_out = len(cube)
             
             # Sidebar filters
             st.sidebar.header("Filters")
@@ -257,28 +252,28 @@ def main():
             summary_group_by = summary_options[selected_summary]
             
             # Portfolio filter
-            portfolios = ['All'] + list(df['Portfolio'].unique())
+            portfolios = ['All'] + dimension_codes.options(cube['Portfolio'])
             selected_portfolio = st.sidebar.selectbox(
                 translations[lang]['portfolio_filter'], 
                 portfolios
             )
             
             # Member filter
-            members = ['All'] + list(df['Member'].unique())
+            members = ['All'] + dimension_codes.options(cube['Member'])
             selected_member = st.sidebar.selectbox(
                 translations[lang]['member_filter'], 
                 members
             )
             
             # Broker filter
-            brokers = ['All'] + list(df['Broker'].unique())
+            brokers = ['All'] + dimension_codes.options(cube['Broker'])
             selected_broker = st.sidebar.selectbox(
                 translations[lang]['broker_filter'], 
                 brokers
             )
             
             # Sector filter
-            sectors = ['All'] + list(df['Sector'].unique())
+            sectors = ['All'] + dimension_codes.options(cube['Sector'])
             selected_sector = st.sidebar.selectbox(
                 translations[lang]['sector_filter'], 
                 sectors
@@ -297,168 +292,106 @@ def main():
                 index=0  # Default to Member
             )
             
-            # Apply filters
-            filtered_df = df.copy()
-            if selected_portfolio != 'All':
-                filtered_df = filtered_df[filtered_df['Portfolio'] == selected_portfolio]
-            if selected_member != 'All':
-                filtered_df = filtered_df[filtered_df['Member'] == selected_member]
-            if selected_broker != 'All':
-                filtered_df = filtered_df[filtered_df['Broker'] == selected_broker]
-            if selected_sector != 'All':
-                filtered_df = filtered_df[filtered_df['Sector'] == selected_sector]
-            
-            if filtered_df.empty:
+            selections = {
+                'Portfolio': selected_portfolio,
+                'Member': selected_member,
+                'Broker': selected_broker,
+                'Sector': selected_sector
+            }
+            sort_column = sort_options[selected_sort]
+            
+            # Each section below names the inputs it depends on and is only
+            # recomputed when those change
+            filter_inputs = (cache_key, tuple(selections.items()))
+            with timings.stage('filter cube', rows_in=len(cube)) as stage:
+                filtered_cube = sections.cached(
+                    'filter', filter_inputs,
+                    lambda: aggregation_cube.slice_cube(cube, selections)
+                )
+                stage.rows_out = len(filtered_cube)
+            
+            if filtered_cube.empty:
                 st.warning("No data available for the selected filters.")
                 return
             
-            # Sort data
-            sort_column = sort_options[selected_sort]
-            filtered_df = filtered_df.sort_values([sort_column, 'Company Name'])
-            
-            # Create summary and detail tables
-            summary_data, summary_display = create_summary_table(filtered_df, translations, lang, summary_group_by)
-            detail_data, detail_display = create_detail_table(filtered_df, translations, lang)
+            filtered_df = None
+            if not streaming:
+                with timings.stage('filter/sort rows', rows_in=len(df)) as stage:
+                    # Resolve filters to row positions through the per-file index,
+                    # sort the positions and slice the frame once
+                    index = file_resource(
+                        dataset, df, cache_key, 'filter_index',
+                        lambda frame: FilterIndex(frame, aggregation_cube.CUBE_DIMENSIONS)
+                    )
+                    filtered_df = sections.cached(
+                        'sort', filter_inputs + (sort_column,),
+                        lambda: filter_holdings(df, selections, index=index, sort_by=[sort_column, 'Company Name'])
+                    )
+                    stage.rows_out = len(filtered_df)
+            
+            # Create summary table
+            with timings.stage('summary', rows_in=len(filtered_cube)) as stage:
+                summary_display = sections.cached(
+                    'summary', filter_inputs + (summary_group_by, lang),
+                    lambda: create_summary_table(filtered_cube, translations, lang, summary_group_by)[1]
+                )
+                stage.rows_out = len(summary_display)
             
             # Display Summary Table
             st.header(translations[lang]['summary_table'])
             
-            # Format summary table for display
-            summary_formatted = summary_display.copy()
-            investment_col = translations[lang]['investment']
-            current_value_col = translations[lang]['current_value']
-            hpr_col = translations[lang]['hpr']
-            
-            # Apply currency formatting
-            summary_formatted[investment_col] = summary_formatted[investment_col].apply(format_currency)
-            summary_formatted[current_value_col] = summary_formatted[current_value_col].apply(format_currency)
-            summary_formatted[hpr_col] = summary_formatted[hpr_col].apply(format_percentage)
-            
-            # Apply conditional formatting and display
-            styled_summary = summary_formatted.style.applymap(
-                style_negative_returns, 
-                subset=[hpr_col]
-            ).set_properties(**{
-                'text-align': 'right'
-            }, subset=[investment_col, current_value_col, hpr_col])
-            
-            st.dataframe(styled_summary, use_container_width=True, hide_index=True)
+            # Numbers stay numeric; column_config formats them and HPR is colored from its values
+            with timings.stage('format/style summary', rows_in=len(summary_display)):
+                table_rendering.render_table(
+                    summary_display,
+                    currency_cols=[translations[lang]['investment'], translations[lang]['current_value']],
+                    percent_cols=[translations[lang]['hpr']],
+                    return_cols=[translations[lang]['hpr']],
+                    use_container_width=True,
+                    hide_index=True
+                )
             
             # Display Detail Table
             st.header(translations[lang]['detail_table'])
             
-            # Format detail table for display
-            detail_formatted = detail_display.copy()
-            invested_amount_col = translations[lang]['invested_amount']
-            current_value_col = translations[lang]['current_value']
-            hpr_col = translations[lang]['hpr']
-            
-            # Apply currency formatting
-            detail_formatted[invested_amount_col] = detail_formatted[invested_amount_col].apply(format_currency)
-            detail_formatted[current_value_col] = detail_formatted[current_value_col].apply(format_currency)
-            detail_formatted[hpr_col] = detail_formatted[hpr_col].apply(format_percentage)
-            
-            # Apply conditional formatting and display
-            styled_detail = detail_formatted.style.applymap(
-                style_negative_returns, 
-                subset=[hpr_col]
-            ).set_properties(**{
-                'text-align': 'right'
-            }, subset=[invested_amount_col, current_value_col, hpr_col])
-            
-            st.dataframe(styled_detail, use_container_width=True, hide_index=True)
+            if filtered_df is None:
+                st.info("The detail table is not available in streaming mode.")
+            else:
+                with timings.stage('detail table', rows_in=len(filtered_df)):
+                    render_detail_section(filtered_df, filter_inputs + (sort_column,), translations, lang)
             
             # Charts Section
             st.header(translations[lang]['charts'])
             
-            # Create charts
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Sector-wise distribution pie chart
-                sector_summary = filtered_df.groupby('Sector')['Value At Market Price'].sum().reset_index()
-                fig_pie = px.pie(
-                    sector_summary, 
-                    values='Value At Market Price', 
-                    names='Sector',
-                    title=translations[lang]['portfolio_distribution']
-                )
-                fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig_pie, use_container_width=True)
-            
-            with col2:
-                # Member-wise performance bar chart
-                member_summary = filtered_df.groupby('Member').agg({
-                    'Value At Cost': 'sum',
-                    'Value At Market Price': 'sum'
-                }).reset_index()
-                member_summary['HPR'] = member_summary.apply(
-                    lambda row: calculate_hpr(row['Value At Market Price'], row['Value At Cost']), 
-                    axis=1
+            with timings.stage('chart build', rows_in=len(filtered_cube)):
+                top_stocks = sections.cached(
+                    'top_performers', filter_inputs,
+                    lambda: aggregates.top_performers(selections) if filtered_df is None else top_performers(filtered_df)
                 )
-                
-                fig_bar = px.bar(
-                    member_summary, 
-                    x='Member', 
-                    y='HPR',
-                    title=translations[lang]['member_performance'],
-                    color='HPR',
-                    color_continuous_scale=['red', 'yellow', 'green']
+                figures = sections.cached(
+                    'charts', filter_inputs + (lang,),
+                    lambda: build_charts(filtered_cube, top_stocks, translations, lang)
                 )
-                fig_bar.update_layout(yaxis_title="HPR (%)")
-                st.plotly_chart(fig_bar, use_container_width=True)
             
-            # Additional charts
+            col1, col2 = st.columns(2)
             col3, col4 = st.columns(2)
-            
-            with col3:
-                # Broker comparison
-                broker_summary = filtered_df.groupby('Broker').agg({
-                    'Value At Cost': 'sum',
-                    'Value At Market Price': 'sum'
-                }).reset_index()
-                broker_summary['HPR'] = broker_summary.apply(
-                    lambda row: calculate_hpr(row['Value At Market Price'], row['Value At Cost']), 
-                    axis=1
-                )
-                
-                fig_broker = px.bar(
-                    broker_summary, 
-                    x='Broker', 
-                    y=['Value At Cost', 'Value At Market Price'],
-                    title=translations[lang]['broker_comparison'],
-                    barmode='group'
-                )
-                st.plotly_chart(fig_broker, use_container_width=True)
-            
-            with col4:
-                # Top performing stocks
-                stock_performance = filtered_df.copy()
-                stock_performance['HPR'] = stock_performance.apply(
-                    lambda row: calculate_hpr(row['Value At Market Price'], row['Value At Cost']), 
-                    axis=1
-                )
-                top_stocks = stock_performance.nlargest(10, 'HPR')
-                
-                fig_top = px.bar(
-                    top_stocks, 
-                    x='HPR', 
-                    y='Company Name',
-                    title=translations[lang]['top_performers'],
-                    orientation='h',
-                    color='HPR',
-                    color_continuous_scale=['red', 'yellow', 'green']
-                )
-                fig_top.update_layout(yaxis={'categoryorder': 'total ascending'})
-                st.plotly_chart(fig_top, use_container_width=True)
+            with timings.stage('chart render'):
+                for column, fig in zip([col1, col2, col3, col4], figures):
+                    with column:
+                        st.plotly_chart(fig, use_container_width=True)
             
             # Portfolio Summary Statistics
             st.header("Portfolio Statistics")
             
-            total_investment = filtered_df['Value At Cost'].sum()
-            total_current_value = filtered_df['Value At Market Price'].sum()
-            total_gain_loss = total_current_value - total_investment
-            total_hpr = calculate_hpr(total_current_value, total_investment)
+            with timings.stage('statistics', rows_in=len(filtered_cube)):
+                metrics = sections.cached(
+                    'statistics', filter_inputs,
+                    lambda: portfolio_metrics(filtered_cube)
+                )
+            total_investment = metrics['investment']
+            total_current_value = metrics['current_value']
+            total_gain_loss = metrics['gain_loss']
+            total_hpr = metrics['hpr']
             
             col1, col2, col3, col4 = st.columns(4)
             
@@ -487,6 +420,63 @@ def main():
                     value=format_percentage(total_hpr),
                     delta=format_percentage(total_hpr)
                 )
+            
+            # Monte Carlo VaR over the whole book, once per holdings and covariance file
+            if df is not None and os.path.exists(VAR_COVARIANCE_FILE):
+                st.header("Value at Risk (1 day)")
+                with timings.stage('value at risk', rows_in=len(df)) as stage, st.spinner("Simulating scenarios..."):
+                    var_table = file_resource(
+                        dataset, df, cache_key, f"var:{path_key(VAR_COVARIANCE_FILE)}",
+                        lambda frame: var_engine.simulate(
+                            frame, VAR_COVARIANCE_FILE, scenarios=VAR_SCENARIOS, workers=VAR_WORKERS
+                        )
+                    )
+                    stage.rows_out = len(var_table)
+                var_columns = [col for col in var_table.columns if col not in ('Level', 'Group')]
+                table_rendering.render_table(
+                    var_table[var_table['Level'].isin(['Portfolio', summary_group_by, 'Total'])],
+                    currency_cols=var_columns,
+                    use_container_width=True,
+                    hide_index=True
+                )
+                st.caption(f"{VAR_SCENARIOS:,} correlated scenarios from {VAR_COVARIANCE_FILE}; "
+                           "losses are positive, unmodelled value has no matching asset")
+            
+            # PDF export of the tables and charts
+            st.header("Export")
+            pdf_lang = pdf_report.PDF_LANG
+            if lang != pdf_lang:
+                st.caption("The PDF report uses English titles and column headers: its fonts cannot show Tamil script.")
+            if st.button("Generate PDF Report"):
+                with st.spinner("Rendering PDF report..."):
+                    summary_pdf = summary_display
+                    if lang != pdf_lang:
+                        summary_pdf = create_summary_table(filtered_cube, translations, pdf_lang, summary_group_by)[1]
+                    detail_display = None
+                    if filtered_df is not None:
+                        _, detail_display = create_detail_table(filtered_df, translations, pdf_lang)
+                    st.session_state.pdf_report = pdf_report.build_pdf(
+                        translations[pdf_lang]['title'],
+                        summary_pdf,
+                        detail_display,
+                        figures
+                    )
+            if 'pdf_report' in st.session_state:
+                st.download_button(
+                    "Download PDF Report",
+                    data=st.session_state.pdf_report,
+                    file_name="portfolio-report.pdf",
+                    mime="application/pdf"
+                )
+            
+            if st.sidebar.checkbox("Show recomputed sections", value=False):
+                sections.render_overlay()
+            if st.sidebar.checkbox("Show stage timings", value=False):
+                stage_timer.render_panel(timings)
+            if dataset is not None:
+                stage_timer.track_session(dataset)
+                if st.sidebar.checkbox("Show memory usage", value=False):
+                    stage_timer.render_memory_panel(dataset)
                 
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
@@ -0,0 +1,95 @@
+import pandas as pd
+
+import aggregation_cube
+import dimension_codes
+import returns_engine
+
+# Streaming ingestion for holdings files too large to hold as one frame. The
+# CSV is read in chunks; each chunk is validated, cleaned and folded into
+# running aggregates whose size depends only on the number of distinct
+# Portfolio × Member × Broker × Sector cells, never on the number of rows:
+#   - the aggregation cube (sums and counts per cell), from which summaries,
+#     sector totals, member/broker charts and statistics are rolled up
+#   - the top-N lots by HPR per cell, so top performers can still be answered
+#     for any filter combination
+
+TOP_COLUMNS = aggregation_cube.CUBE_DIMENSIONS + ['Company Name', 'Qty', 'Value At Cost', 'Value At Market Price', 'HPR']
+
+
+class StreamingAggregates:
+    """Running aggregates of a chunked holdings file"""
+
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+        self.rows = 0
+        self.chunks = 0
+        self.cube = None
+        self.top = None
+
+    def fold(self, chunk):
+        """Fold one cleaned chunk into the running aggregates"""
+        self.rows += len(chunk)
+        self.chunks += 1
+
+        chunk_cube = aggregation_cube.build_cube(chunk)
+        if self.cube is None:
+            self.cube = chunk_cube
+        else:
+            merged = pd.concat([self.cube, chunk_cube], ignore_index=True)
+            self.cube = merged.groupby(aggregation_cube.CUBE_DIMENSIONS, sort=False).sum().reset_index()
+
+        chunk = chunk.assign(HPR=returns_engine.hpr(chunk['Value At Market Price'], chunk['Value At Cost']))
+        candidates = chunk[TOP_COLUMNS] if self.top is None else pd.concat([self.top, chunk[TOP_COLUMNS]], ignore_index=True)
+        self.top = (
+            candidates.sort_values('HPR', ascending=False, kind='stable')
+            .groupby(aggregation_cube.CUBE_DIMENSIONS, sort=False)
+            .head(self.top_n)
+            .reset_index(drop=True)
+        )
+
+    def finish(self):
+        """Encode dimensions with one shared dictionary once all chunks are folded"""
+        if self.cube is None:
+            self.cube = pd.DataFrame(columns=aggregation_cube.CUBE_DIMENSIONS + aggregation_cube.CUBE_MEASURES + ['Count'])
+            self.top = pd.DataFrame(columns=TOP_COLUMNS)
+        dictionary = {}
+        dimension_codes.encode_dimensions(self.cube, aggregation_cube.CUBE_DIMENSIONS, dictionary)
+        dimension_codes.encode_dimensions(self.top, aggregation_cube.CUBE_DIMENSIONS + ['Company Name'], dictionary)
+        return self
+
+    def top_performers(self, filters, n=10):
+        """Top n lots by HPR among the cells matching filters ({dimension: value}, 'All' for no filter)"""
+        top = self.top
+        for dim, value in filters.items():
+            if value is None or value == 'All':
+                continue
+            top = top[dimension_codes.equals_mask(top[dim], value)]
+        return top.nlargest(n, 'HPR')
+
+
+def clean_chunk(chunk):
+    """Convert the numeric columns of a chunk, treating unparseable values as 0"""
+    for col in aggregation_cube.CUBE_MEASURES:
+        chunk[col] = pd.to_numeric(chunk[col], errors='coerce').fillna(0)
+    return chunk
+
+
+def stream_aggregate(source, required_columns, chunksize=250_000, top_n=10):
+    """Read a holdings CSV (path or file object) in chunks and return its StreamingAggregates
+
+    Raises ValueError listing the missing columns when the header does not
+    contain every required column.
+    """
+    aggregates = StreamingAggregates(top_n=top_n)
+    reader = pd.read_csv(
+        source,
+        usecols=lambda col: col in required_columns,
+        chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            missing_columns = [col for col in required_columns if col not in chunk.columns]
+            if missing_columns:
+                raise ValueError(f"Missing columns: {', '.join(missing_columns)}")
+            aggregates.fold(clean_chunk(chunk))
+    return aggregates.finish()
@@ -0,0 +1,54 @@
+import numpy as np
+import streamlit as st
+
+# Table rendering that keeps numbers numeric. Display formatting is done by
+# the frontend through column_config, and return columns are colored with CSS
+# computed in one vectorized pass over the numeric values instead of
+# formatting every cell to a string and parsing it back.
+
+NEGATIVE_STYLE = 'background-color: #ffebee; color: #c62828'
+POSITIVE_STYLE = 'background-color: #e8f5e8; color: #2e7d32'
+
+# Above this many cells Styler serialization dominates, so tables are sent
+# unstyled (pandas' own render limit is styler.render.max_elements = 262144)
+MAX_STYLED_CELLS = 262144
+
+
+def return_styles(values, negative_style=NEGATIVE_STYLE, positive_style=POSITIVE_STYLE):
+    """CSS per value: negative_style below zero, positive_style above zero, none at zero or NaN"""
+    values = np.asarray(values, dtype='float64')
+    return np.where(values < 0, negative_style, np.where(values > 0, positive_style, ''))
+
+
+def style_returns(df, return_cols, negative_style=NEGATIVE_STYLE, positive_style=POSITIVE_STYLE):
+    """Styler coloring return_cols from their numeric values, or df itself when it is too large to style"""
+    if df.size > MAX_STYLED_CELLS:
+        return df
+    return df.style.apply(
+        lambda col: return_styles(col.to_numpy(), negative_style, positive_style),
+        subset=return_cols,
+        axis=0
+    )
+
+
+def number_column_config(currency_cols=(), percent_cols=(), currency_format="₹%,.2f", percent_format="%.2f%%"):
+    """column_config entries formatting currency and percentage columns on the frontend"""
+    config = {}
+    for col in currency_cols:
+        config[col] = st.column_config.NumberColumn(col, format=currency_format)
+    for col in percent_cols:
+        config[col] = st.column_config.NumberColumn(col, format=percent_format)
+    return config
+
+
+def render_table(df, currency_cols=(), percent_cols=(), return_cols=None, currency_format="₹%,.2f",
+                 percent_format="%.2f%%", negative_style=NEGATIVE_STYLE, positive_style=POSITIVE_STYLE, **kwargs):
+    """Show df with numeric formatting from column_config and colored return columns"""
+    data = df
+    if return_cols:
+        data = style_returns(df, list(return_cols), negative_style, positive_style)
+    st.dataframe(
+        data,
+        column_config=number_column_config(currency_cols, percent_cols, currency_format, percent_format),
+        **kwargs
+    )
@@ -0,0 +1,35 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aggregation_cube
+from portfolio_core import clean_portfolio_data, load_portfolio_file, portfolio_metrics
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class BlankDimensionTest(unittest.TestCase):
+    def setUp(self):
+        df, _ = load_portfolio_file(os.path.join(REPO_DIR, 'portfolio-inputs.csv'))
+        df = df.astype({dim: object for dim in aggregation_cube.CUBE_DIMENSIONS})
+        df.loc[df.index[:3], 'Broker'] = np.nan
+        df.loc[df.index[5], 'Sector'] = np.nan
+        self.df = clean_portfolio_data(df)
+
+    def test_totals_include_rows_with_blank_dimensions(self):
+        # The dashboard used to sum every row of the frame
+        metrics = portfolio_metrics(aggregation_cube.build_cube(self.df))
+        self.assertAlmostEqual(metrics['investment'], self.df['Value At Cost'].sum(), places=6)
+        self.assertAlmostEqual(metrics['current_value'], self.df['Value At Market Price'].sum(), places=6)
+
+    def test_row_counts_are_kept(self):
+        cube = aggregation_cube.build_cube(self.df)
+        self.assertEqual(cube['Count'].sum(), len(self.df))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_report import slugify
+
+
+class SlugifyTest(unittest.TestCase):
+    def test_keeps_non_ascii_letters(self):
+        self.assertTrue(slugify('பவித்ரா').startswith('பவித்ரா-'))
+
+    def test_distinct_values_get_distinct_slugs(self):
+        values = ['A.B', 'A B', 'a b', 'பவித்ரா', 'சுசித்ரா', '', '---']
+        self.assertEqual(len({slugify(value) for value in values}), len(values))
+
+    def test_is_stable(self):
+        self.assertEqual(slugify('ICICI Direct'), slugify('ICICI Direct'))
+        self.assertTrue(slugify('ICICI Direct').startswith('icici-direct-'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import capital_gains
+import columnar_store
+import lot_matching
+import portfolio_core
+
+
+def transactions(rows):
+    columns = ["broker name", "family member name", "stock code", "sector code", "portfolio metrics code",
+               "quantity", "invested amount", "current value", "transaction date"]
+    df = columnar_store.apply_schema(pd.DataFrame(rows, columns=columns))
+    return portfolio_core.add_holding_period(df, "2025-06-30")
+
+
+class BlankKeyTest(unittest.TestCase):
+    def setUp(self):
+        self.df = transactions([
+            ["ICICI", "Asha", "TCS", "IT", 1.0, 10, 1000.0, 1500.0, "01-01-2023"],
+            ["ICICI", "Asha", "TCS", "IT", 1.0, -4, 600.0, 0.0, "01-06-2024"],
+            ["ICICI", None, "INFY", "IT", 1.1, 5, 500.0, 700.0, "01-01-2023"],
+            ["ICICI", None, "INFY", "IT", 1.1, -5, 650.0, 0.0, "01-05-2025"],
+            [None, "Asha", None, "Banks", 0.9, 8, 800.0, 900.0, "01-02-2024"],
+        ])
+
+    def test_blank_keys_match_within_their_own_lots(self):
+        matches, open_lots = lot_matching.match_lots(self.df)
+        self.assertEqual(sorted(matches["quantity"]), [4.0, 5.0])
+        blank_member = matches[matches["family member name"].isna()]
+        self.assertAlmostEqual(blank_member["realized gain"].sum(), 150.0)
+        self.assertEqual(sorted(open_lots["quantity"]), [6.0, 8.0])
+
+    def test_blank_rows_stay_in_summaries(self):
+        matches, open_lots = lot_matching.match_lots(self.df)
+        gains = lot_matching.gains_summary(matches, open_lots, "family member name")
+        self.assertEqual(len(gains), 3)
+        _, summary = portfolio_core.summarize_transactions(self.df, "stock code")
+        self.assertAlmostEqual(summary["current value"].iloc[-1], 1500.0 * 6 / 10 + 900.0)
+
+    def test_member_tax_names_blank_member(self):
+        tax = capital_gains.member_tax(self.df, "2025-06-30")
+        blank = tax[tax["family member name"] == "(blank)"]
+        self.assertAlmostEqual(blank["stcg"].iloc[0] + blank["ltcg"].iloc[0], 150.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
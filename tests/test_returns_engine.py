@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import returns_engine
+
+
+class XirrTest(unittest.TestCase):
+    def test_one_year_doubling(self):
+        rate = returns_engine.xirr([0, 0], [-100.0, 200.0], [1.0, 0.0])
+        self.assertAlmostEqual(rate[0], 1.0, places=6)
+
+    def test_recent_lot_outside_range_is_nan(self):
+        # Up 20% three days after buying annualizes to ~4e9 (%), beyond XIRR_MAX_RATE
+        rate = returns_engine.xirr([0, 0], [-100.0, 120.0], [3 / 365, 0.0])
+        self.assertTrue(np.isnan(rate[0]))
+
+    def test_recent_lot_inside_range(self):
+        # Up 1% three days after buying: about 236% a year
+        rate = returns_engine.xirr([0, 0], [-100.0, 101.0], [3 / 365, 0.0])
+        self.assertAlmostEqual(rate[0], 1.01 ** (365 / 3) - 1, places=6)
+
+    def test_rates_stay_in_range(self):
+        rng = np.random.default_rng(0)
+        groups = 3000
+        group = np.repeat(np.arange(groups), 2)
+        years = np.column_stack([rng.uniform(1, 2000, groups) / 365, np.zeros(groups)]).ravel()
+        amounts = np.column_stack([-rng.uniform(1e3, 1e5, groups), rng.uniform(1e3, 3e5, groups)]).ravel()
+        rate = returns_engine.xirr(group, amounts, years)
+        finite = rate[np.isfinite(rate)]
+        self.assertTrue(((finite >= returns_engine.XIRR_MIN_RATE) & (finite <= returns_engine.XIRR_MAX_RATE)).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dimension_codes
+import risk_metrics
+
+
+class BlankLevelTest(unittest.TestCase):
+    def setUp(self):
+        df = pd.DataFrame({
+            "broker name": ["ICICI", None, "Zerodha", None],
+            "portfolio metrics code": [1.0, 2.0, 0.5, 1.5],
+            "current value": [100.0, 300.0, 200.0, 100.0]
+        })
+        dimension_codes.encode_dimensions(df, ["broker name"])
+        self.df = df
+
+    def test_blank_values_form_their_own_group(self):
+        weighted = risk_metrics.WeightedMetrics(self.df, ["broker name"]).weighted("broker name")
+        self.assertEqual(list(weighted["broker name"]), ["ICICI", "Zerodha", dimension_codes.BLANK_LABEL])
+        self.assertAlmostEqual(weighted["weighted portfolio metrics code"].iloc[-1], (600 + 150) / 400)
+        self.assertAlmostEqual(weighted["current value"].sum(), 700.0)
+
+    def test_update_of_blank_row_changes_blank_group(self):
+        metrics = risk_metrics.WeightedMetrics(self.df, ["broker name"])
+        metrics.update(3, weight=300.0)
+        weighted = metrics.weighted("broker name")
+        self.assertAlmostEqual(weighted["current value"].iloc[-1], 600.0)
+        self.assertAlmostEqual(weighted["current value"].iloc[0], 100.0)
+
+    def test_uncategorized_column(self):
+        df = self.df.astype({"broker name": object})
+        weighted = risk_metrics.WeightedMetrics(df, ["broker name"]).weighted("broker name")
+        self.assertEqual(weighted["broker name"].iloc[-1], dimension_codes.BLANK_LABEL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dimension_codes
+import var_engine
+
+
+class BlankLevelTest(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Portfolio': ['MBPS', 'MBPS', 'MBPS'],
+            'Member': ['Asha', 'Ravi', None],
+            'Sector': ['Banks', 'Steel', 'Banks'],
+            'Broker': ['ICICI', None, 'ICICI'],
+            'Company Name': ['HDFC BANK', 'TATA STEEL', 'SBI'],
+            'Value At Market Price': [1000.0, 500.0, 250.0]
+        })
+        self.tmp = tempfile.TemporaryDirectory()
+        self.covariance = os.path.join(self.tmp.name, 'returns-covariance.csv')
+        pd.DataFrame({
+            'asset': ['Banks', 'Steel'],
+            'mean': [0.0004, 0.0003],
+            'Banks': [0.0002, 0.00005],
+            'Steel': [0.00005, 0.0003]
+        }).to_csv(self.covariance, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_blank_values_form_their_own_group(self):
+        assets, _, _ = var_engine.load_covariance(self.covariance)
+        groups, exposure = var_engine.exposures(self.df, assets)
+        blank = groups[groups['Group'] == dimension_codes.BLANK_LABEL]
+        self.assertEqual(sorted(blank['Level']), ['Broker', 'Member'])
+        self.assertEqual(sorted(blank['Value']), [250.0, 500.0])
+        # Every level still adds up to the whole book
+        for level in var_engine.VAR_LEVELS + ['Total']:
+            self.assertAlmostEqual(groups.loc[groups['Level'] == level, 'Value'].sum(), 1750.0)
+        self.assertTrue(np.allclose(exposure[groups['Level'] == 'Broker'].sum(axis=0), exposure[-1]))
+
+    def test_simulate_with_blank_values(self):
+        result = var_engine.simulate(self.df, self.covariance, scenarios=20_000, batch_size=5_000)
+        self.assertTrue((result['VaR 99%'] > 0).all())
+        self.assertTrue((result['CVaR 99%'] >= result['VaR 99%']).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
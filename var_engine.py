@@ -0,0 +1,207 @@
+"""Monte Carlo Value at Risk and Conditional VaR per Portfolio, Member, Sector and Broker.
+
+Returns are drawn from a multivariate normal given by a local returns/covariance
+file: one row per asset with its mean daily return and its row of the daily
+covariance matrix.
+
+    asset,mean,Banks,Steel,...
+    Banks,0.0004,0.00021,0.00009,...
+    Steel,0.0003,0.00009,0.00034,...
+
+Assets are matched to holdings by Company Name, falling back to Sector, so a
+sector-level file covers every holding in that sector. Holdings matching
+neither are left out of the simulation and reported as unmodelled value.
+
+Every group at every level is a row of one exposure matrix (groups × assets),
+so group P&L is jointly normal with covariance exposure @ cov @ exposure.T.
+A batch of scenarios is one matrix product of standard normals with a factor
+of that covariance, and only the worst tail of each group's P&L is kept
+between batches.
+Batches are seeded from one SeedSequence, so results depend only on the seed
+and scenario count, not on how batches are split across the process pool.
+
+Usage:
+    python var_engine.py portfolio-inputs.csv returns-covariance.csv --scenarios 1000000 --workers 8
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import dimension_codes
+
+# Every dashboard grouping gets a row per group
+VAR_LEVELS = ['Portfolio', 'Member', 'Sector', 'Broker']
+CONFIDENCE_LEVELS = (0.95, 0.99)
+ASSET_COLUMNS = ['Company Name', 'Sector']
+VALUE_COLUMN = 'Value At Market Price'
+
+# Per-worker simulation inputs, set once by the pool initializer
+_worker = {}
+
+
+def load_covariance(path):
+    """(assets, mean, covariance) from a returns/covariance CSV"""
+    table = pd.read_csv(path)
+    assets = pd.Index(table['asset'].astype(str))
+    missing = [asset for asset in assets if asset not in table.columns]
+    if missing:
+        raise ValueError(f"Covariance columns missing for: {', '.join(missing[:5])}")
+    covariance = table[list(assets)].to_numpy(dtype='float64')
+    if not np.allclose(covariance, covariance.T, rtol=1e-6, atol=1e-12):
+        raise ValueError("Covariance matrix is not symmetric")
+    return assets, table['mean'].to_numpy(dtype='float64'), covariance
+
+
+def pnl_factor(exposure, covariance, tol=1e-12):
+    """Matrix F with F @ F.T == exposure @ covariance @ exposure.T, one column per non-zero eigenvalue
+
+    Group P&L is normal with that covariance, so drawing it through F needs
+    only as many normals per scenario as the covariance has rank — at most the
+    number of groups however many assets the covariance file has.
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(exposure @ covariance @ exposure.T)
+    kept = eigenvalues > tol * max(eigenvalues.max(), 0)
+    return eigenvectors[:, kept] * np.sqrt(eigenvalues[kept])
+
+
+def asset_index(df, assets):
+    """Position in assets of each holding (by Company Name, then Sector), -1 when unmatched"""
+    index = np.full(len(df), -1)
+    for col in reversed(ASSET_COLUMNS):
+        if col in df.columns:
+            found = assets.get_indexer(df[col].astype(str))
+            index = np.where(found >= 0, found, index)
+    return index
+
+
+def exposures(df, assets, levels=VAR_LEVELS):
+    """(groups, exposure) where groups lists (level, group, value) per row of the groups × assets exposure matrix
+
+    The last row is the whole book. value is the market value of the group's
+    holdings; only the part matched to an asset carries exposure.
+    """
+    asset = asset_index(df, assets)
+    value = df[VALUE_COLUMN].to_numpy(dtype='float64')
+    matched = asset >= 0
+    n_assets = len(assets)
+    blocks, rows = [], []
+    for level in levels + [None]:
+        if level is None:
+            codes, labels = np.zeros(len(df), dtype='int64'), pd.Index(['All'])
+        else:
+            codes, labels = pd.factorize(df[level], sort=True)
+            # Blank values (code -1) get a group of their own, after the others
+            blank = codes < 0
+            if blank.any():
+                codes = np.where(blank, len(labels), codes)
+                labels = pd.Index(labels, dtype=object).append(pd.Index([dimension_codes.BLANK_LABEL]))
+        cells = np.bincount(codes[matched] * n_assets + asset[matched], weights=value[matched],
+                            minlength=len(labels) * n_assets)
+        blocks.append(cells.reshape(len(labels), n_assets))
+        rows.append(pd.DataFrame({
+            'Level': 'Total' if level is None else level,
+            'Group': np.asarray(labels, dtype=object),
+            'Value': np.bincount(codes, weights=value, minlength=len(labels)),
+            'Unmodelled Value': np.bincount(codes, weights=np.where(matched, 0.0, value), minlength=len(labels))
+        }))
+    return pd.concat(rows, ignore_index=True), np.vstack(blocks)
+
+
+def _init_worker(mean_pnl, loadings, keep):
+    _worker.update({'mean_pnl': mean_pnl, 'loadings': loadings, 'keep': keep})
+
+
+def simulate_batches(batches):
+    """Worst `keep` P&L outcomes per group (groups × keep) over the given (seed sequence, size) batches
+
+    P&L of a batch is mean_pnl + loadings @ Z.T, with Z standard normal
+    (size × factors) and loadings from pnl_factor. Batches are appended group-major to a buffer
+    that is partitioned in place whenever it fills, so each group's tail is a
+    contiguous row.
+    """
+    mean_pnl, loadings, keep = _worker['mean_pnl'], _worker['loadings'], _worker['keep']
+    width = keep + max(size for _, size in batches)
+    buffer = np.empty((len(mean_pnl), width))
+    filled = 0
+    for seed, size in batches:
+        if filled + size > width:
+            buffer[:, :filled].partition(keep - 1, axis=1)
+            filled = keep
+        rng = np.random.default_rng(seed)
+        buffer[:, filled:filled + size] = loadings @ rng.standard_normal((size, loadings.shape[1])).T
+        buffer[:, filled:filled + size] += mean_pnl[:, None]
+        filled += size
+    if filled > keep:
+        buffer[:, :filled].partition(keep - 1, axis=1)
+    return buffer[:, :min(keep, filled)]
+
+
+def simulate(df, covariance_path, scenarios=1_000_000, batch_size=50_000, workers=1, seed=0,
+             horizon_days=1, confidence=CONFIDENCE_LEVELS, levels=VAR_LEVELS):
+    """VaR and CVaR (as positive losses) per group of each level and for the whole book"""
+    assets, mean, covariance = load_covariance(covariance_path)
+    groups, exposure = exposures(df, assets, levels)
+
+    # Only assets somebody holds take part
+    held = exposure.any(axis=0)
+    exposure, mean, covariance = exposure[:, held], mean[held], covariance[np.ix_(held, held)]
+    mean_pnl = exposure @ (mean * horizon_days)
+    loadings = pnl_factor(exposure, covariance * horizon_days)
+
+    keep = math.ceil(scenarios * (1 - min(confidence)))
+    sizes = [min(batch_size, scenarios - start) for start in range(0, scenarios, batch_size)]
+    batches = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+    init_args = (mean_pnl, loadings, keep)
+
+    if workers and workers > 1:
+        chunks = [batches[i::workers] for i in range(workers) if batches[i::workers]]
+        with ProcessPoolExecutor(max_workers=len(chunks), initializer=_init_worker, initargs=init_args) as pool:
+            worst = np.concatenate(list(pool.map(simulate_batches, chunks)), axis=1)
+        worst = np.partition(worst, keep - 1, axis=1)[:, :keep]
+    else:
+        _init_worker(*init_args)
+        worst = simulate_batches(batches)
+
+    worst.sort(axis=1)
+    for level in confidence:
+        tail = math.ceil(scenarios * (1 - level))
+        label = f"{level * 100:g}%"
+        groups[f"VaR {label}"] = -worst[:, tail - 1]
+        groups[f"CVaR {label}"] = -worst[:, :tail].mean(axis=1)
+    return groups
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo VaR/CVaR per Portfolio, Member, Sector and Broker")
+    parser.add_argument('holdings', help="Holdings CSV with the dashboard's required columns")
+    parser.add_argument('covariance', help="Returns/covariance CSV (asset, mean, one column per asset)")
+    parser.add_argument('--scenarios', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=50_000)
+    parser.add_argument('--horizon-days', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', help="Write the table to this CSV instead of printing it")
+    args = parser.parse_args(argv)
+
+    from portfolio_core import load_portfolio_file
+
+    start = time.perf_counter()
+    df, _ = load_portfolio_file(args.holdings)
+    result = simulate(df, args.covariance, scenarios=args.scenarios, batch_size=args.batch_size,
+                      workers=args.workers, seed=args.seed, horizon_days=args.horizon_days)
+    if args.output:
+        result.to_csv(args.output, index=False)
+    else:
+        print(result.to_string(index=False))
+    print(f"{args.scenarios:,} scenarios in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())